@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+import pygame
+
+from benchmarks.maps import path_cost, scatter_boxes
+from src.nav.astar import astar_indices
+from src.nav.graph import generate_nav_lattice
+
+
+def bounding_rect(polygon: list[pygame.Vector2]) -> pygame.Rect:
+    left = min(p.x for p in polygon)
+    top = min(p.y for p in polygon)
+    right = max(p.x for p in polygon)
+    bottom = max(p.y for p in polygon)
+    return pygame.Rect(int(left), int(top), int(right - left) + 1, int(bottom - top) + 1)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Check that lattice repair matches a fresh build after obstacle edits."
+    )
+    parser.add_argument("--width", type=int, default=1600)
+    parser.add_argument("--height", type=int, default=1200)
+    parser.add_argument("--boxes", type=int, default=60)
+    parser.add_argument("--edits", type=int, default=40)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    bounds = pygame.Rect(10, 10, args.width - 20, args.height - 20)
+    seed = pygame.Vector2(80, 80)
+    obstacles = scatter_boxes(bounds, args.boxes, rng, seed)
+    graph = generate_nav_lattice(obstacles, bounds, seed)
+
+    repaired = 0
+    started = time.perf_counter()
+    for _ in range(args.edits):
+        if obstacles and rng.random() < 0.5:
+            polygon = obstacles.pop(rng.randrange(len(obstacles)))
+        else:
+            polygon = scatter_boxes(bounds, 1, rng, seed)[0]
+            obstacles.append(polygon)
+        repaired += len(graph.repair(obstacles, bounding_rect(polygon)))
+    elapsed = time.perf_counter() - started
+    print(
+        f"{args.edits} edits: {repaired} cells changed "
+        f"in {elapsed * 1000.0 / args.edits:.2f} ms/edit"
+    )
+
+    fresh = generate_nav_lattice(obstacles, bounds, seed)
+    print(f"  blocked mismatches: {sum(a != b for a, b in zip(graph.blocked, fresh.blocked))}")
+    print(f"  edge mismatches: {sum(a != b for a, b in zip(graph.targets, fresh.targets))}")
+    print(
+        f"  edge cost mismatches: "
+        f"{sum(abs(a - b) > 1e-3 for a, b in zip(graph.costs, fresh.costs))}"
+    )
+
+    free = [index for index in range(len(fresh)) if not fresh.blocked[index]]
+    pairs = [(rng.choice(free), rng.choice(free)) for _ in range(args.queries)]
+    mismatched = 0
+    for a, b in pairs:
+        expected = path_cost(fresh, astar_indices(fresh, a, b))
+        actual = path_cost(graph, astar_indices(graph, a, b))
+        mismatched += abs(expected - actual) > 1e-3 * max(1.0, expected)
+    print(f"  path cost mismatches: {mismatched}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+
+import pygame
+
+from benchmarks.maps import path_cost, scatter_boxes
+from src.core.config import NAV_HPA_CLUSTER_SIZE
+from src.nav.astar import astar_indices
+from src.nav.graph import generate_nav_graph
+from src.nav.hpa import HierarchicalGraph
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare HPA* and A* latency on large maps.")
+    parser.add_argument("--width", type=int, default=2400)
+    parser.add_argument("--height", type=int, default=1600)
+    parser.add_argument("--boxes", type=int, default=120)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--cluster-size", type=int, default=NAV_HPA_CLUSTER_SIZE)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    bounds = pygame.Rect(10, 10, args.width - 20, args.height - 20)
+    seed = pygame.Vector2(80, 80)
+    obstacles = scatter_boxes(bounds, args.boxes, rng, seed)
+
+    started = time.perf_counter()
+    graph = generate_nav_graph(obstacles, bounds, seed)
+    print(f"nav graph: {len(graph)} nodes in {time.perf_counter() - started:.2f}s")
+
+    started = time.perf_counter()
+    hierarchy = HierarchicalGraph(graph, args.cluster_size)
+    print(
+        f"hierarchy: {len(hierarchy.abstract)} abstract nodes "
+        f"in {time.perf_counter() - started:.2f}s"
+    )
+
+    pairs = [(rng.randrange(len(graph)), rng.randrange(len(graph))) for _ in range(args.queries)]
+    results = {}
+    for name, solve in (
+        ("astar", lambda a, b: astar_indices(graph, a, b)),
+        ("hpa-first", lambda a, b: hierarchy.find_path(a, b, refine_all=False)),
+        ("hpa", lambda a, b: hierarchy.find_path(a, b)),
+    ):
+        timings = []
+        costs = []
+        for a, b in pairs:
+            started = time.perf_counter()
+            path = solve(a, b)
+            timings.append((time.perf_counter() - started) * 1000.0)
+            costs.append(path_cost(graph, path))
+        results[name] = costs
+        timings.sort()
+        print(
+            f"{name:>10}: mean {statistics.fmean(timings):7.2f} ms  "
+            f"p50 {timings[len(timings) // 2]:7.2f} ms  "
+            f"p95 {timings[int(len(timings) * 0.95)]:7.2f} ms"
+        )
+
+    ratio = sum(results["hpa"]) / max(sum(results["astar"]), 1e-9)
+    print(f"hpa path length vs astar: {ratio:.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
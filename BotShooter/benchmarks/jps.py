@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+import pygame
+
+from benchmarks.maps import path_cost, scatter_boxes
+from src.game.world import build_obstacles
+from src.nav.astar import astar_indices
+from src.nav.graph import NavGraph, generate_nav_graph
+from src.nav.jps import JumpPointSearch
+
+
+def compare(name: str, graph: NavGraph, queries: int, rng: random.Random) -> None:
+    jump_points = JumpPointSearch(graph)
+    pairs = [(rng.randrange(len(graph)), rng.randrange(len(graph))) for _ in range(queries)]
+    print(f"{name}: {len(graph)} nodes, {queries} queries")
+
+    costs = {}
+    for label, solve in (
+        ("astar", lambda a, b: astar_indices(graph, a, b)),
+        ("jps", lambda a, b: jump_points.find_path(a, b)),
+    ):
+        graph.stats.reset()
+        started = time.perf_counter()
+        costs[label] = [path_cost(graph, solve(a, b)) for a, b in pairs]
+        elapsed = time.perf_counter() - started
+        print(
+            f"  {label:>5}: {elapsed * 1000.0 / queries:7.2f} ms/query  "
+            f"{graph.stats.expanded / queries:8.1f} expanded/query"
+        )
+
+    mismatched = sum(
+        abs(a - b) > 1e-3 * max(1.0, a) for a, b in zip(costs["astar"], costs["jps"])
+    )
+    print(f"  cost mismatches: {mismatched}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare Jump Point Search with A*.")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    compare("shipped map", generate_nav_graph(build_obstacles()), args.queries, rng)
+
+    for width, height, boxes in ((2400, 1600, 120), (4000, 3000, 400)):
+        bounds = pygame.Rect(10, 10, width - 20, height - 20)
+        seed = pygame.Vector2(80, 80)
+        obstacles = scatter_boxes(bounds, boxes, rng, seed)
+        graph = generate_nav_graph(obstacles, bounds, seed)
+        compare(f"{width}x{height} with {boxes} boxes", graph, args.queries, rng)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import random
+
+import pygame
+
+from src.nav.graph import NavGraph
+
+
+def scatter_boxes(
+    bounds: pygame.Rect, count: int, rng: random.Random, keep_clear: pygame.Vector2
+) -> list[list[pygame.Vector2]]:
+    obstacles = []
+    while len(obstacles) < count:
+        w = rng.uniform(30, 160)
+        h = rng.uniform(30, 160)
+        x = rng.uniform(bounds.left + 20, bounds.right - w - 20)
+        y = rng.uniform(bounds.top + 20, bounds.bottom - h - 20)
+        if pygame.Rect(x, y, w, h).inflate(60, 60).collidepoint(keep_clear.x, keep_clear.y):
+            continue
+        obstacles.append(
+            [
+                pygame.Vector2(x, y),
+                pygame.Vector2(x + w, y),
+                pygame.Vector2(x + w, y + h),
+                pygame.Vector2(x, y + h),
+            ]
+        )
+    return obstacles
+
+
+def path_cost(graph: NavGraph, path: list[int]) -> float:
+    return sum(graph.distance(a, b) for a, b in zip(path, path[1:]))
@@ -0,0 +1,357 @@
+from __future__ import annotations
+
+import argparse
+import functools
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+
+import pygame
+
+from benchmarks.maps import scatter_boxes
+from src.ai import behavior as ai
+from src.core.config import BOT_ARRAY_STORE, MAP_BOUNDS, NAV_PLANNER, NAV_SEED, ROCKET_SPEED
+from src.core.geometry import ObstacleSet, has_line_of_sight
+from src.game import combat
+from src.game.arena import SCENARIOS, scenario_arena
+from src.game.entities import Bot, Rocket
+from src.game.world import World, build_obstacles
+from src.nav.astar import astar_indices
+from src.nav.graph import NavGraph, generate_nav_graph
+from src.nav.graph_cache import load_or_build_nav_graph
+
+MAP_SIZES = {
+    "arena": None,
+    "medium": (2400, 1600, 120),
+    "large": (4800, 3200, 480),
+}
+BOT_COUNTS = (4, 32, 128)
+DEFAULT_SCENARIOS = ("small", "medium")
+CROWD_SCENARIO = "medium"
+CROWD_BOTS = 1000
+DEFAULT_THRESHOLD = 0.10
+
+
+def build_map(size: str) -> tuple[ObstacleSet, pygame.Rect, pygame.Vector2]:
+    spec = MAP_SIZES[size]
+    if spec is None:
+        return ObstacleSet(build_obstacles()), MAP_BOUNDS, NAV_SEED
+    width, height, boxes = spec
+    bounds = pygame.Rect(10, 10, width - 20, height - 20)
+    seed = pygame.Vector2(80, 80)
+    return ObstacleSet(scatter_boxes(bounds, boxes, random.Random(1), seed)), bounds, seed
+
+
+def random_point(bounds: pygame.Rect, rng: random.Random) -> pygame.Vector2:
+    return pygame.Vector2(rng.uniform(bounds.left, bounds.right), rng.uniform(bounds.top, bounds.bottom))
+
+
+def scatter_bots(graph: NavGraph, count: int, rng: random.Random) -> list[Bot]:
+    bots = []
+    for bot_id in range(1, count + 1):
+        pos = pygame.Vector2(graph.node(rng.randrange(len(graph))).pos)
+        bots.append(Bot(bot_id=bot_id, pos=pos, spawn_pos=pos.copy()))
+    return bots
+
+
+def measure(
+    run: Callable[[object], object],
+    setup: Callable[[], object] = lambda: None,
+    repeat: int = 5,
+    number: int = 1,
+) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        state = setup()
+        started = time.perf_counter()
+        run(state)
+        timings.append((time.perf_counter() - started) * 1000.0 / number)
+    return timings
+
+
+def summarize(name: str, params: dict, timings: list[float], unit: str = "call") -> dict:
+    ordered = sorted(timings)
+    return {
+        "name": name,
+        "params": params,
+        "unit": unit,
+        "runs": len(ordered),
+        "min_ms": round(ordered[0], 4),
+        "median_ms": round(statistics.median(ordered), 4),
+        "mean_ms": round(statistics.fmean(ordered), 4),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 4),
+    }
+
+
+def bench_nav(size: str, repeat: int) -> list[dict]:
+    obstacles, bounds, seed = build_map(size)
+    params = {"map": size}
+    results = [
+        summarize(
+            "generate_nav_graph",
+            params,
+            measure(lambda _: generate_nav_graph(obstacles, bounds, seed), repeat=repeat),
+        )
+    ]
+    graph = generate_nav_graph(obstacles, bounds, seed)
+    params = {"map": size, "nodes": len(graph)}
+    rng = random.Random(2)
+
+    points = [random_point(bounds, rng) for _ in range(1000)]
+    results.append(
+        summarize(
+            "nearest_node",
+            params,
+            measure(lambda _: [graph.nearest_node(p) for p in points], repeat=repeat, number=1000),
+        )
+    )
+
+    pairs = [(rng.randrange(len(graph)), rng.randrange(len(graph))) for _ in range(40)]
+    results.append(
+        summarize(
+            "astar",
+            params,
+            measure(
+                lambda _: [astar_indices(graph, a, b) for a, b in pairs],
+                repeat=repeat,
+                number=len(pairs),
+            ),
+        )
+    )
+
+    segments = [(random_point(bounds, rng), random_point(bounds, rng)) for _ in range(1000)]
+    results.append(
+        summarize(
+            "has_line_of_sight",
+            params,
+            measure(
+                lambda _: [has_line_of_sight(a, b, obstacles) for a, b in segments],
+                repeat=repeat,
+                number=len(segments),
+            ),
+        )
+    )
+    return results
+
+
+def bench_rockets(bots: int, repeat: int) -> dict:
+    world = World(1, scatter_bots(_arena_graph(), bots, random.Random(3)))
+    rng = random.Random(4)
+
+    def setup() -> list[Rocket]:
+        rockets = []
+        for bot in world.bots:
+            direction = pygame.Vector2(1, 0).rotate(rng.uniform(0, 360))
+            rockets.append(Rocket(bot.pos + direction * 20, direction * ROCKET_SPEED, bot.bot_id))
+        return rockets
+
+    def run(rockets: list[Rocket]) -> None:
+        for _ in range(10):
+            combat.update_rockets(
+                rockets, world.bots, world.obstacles, 1 / 60, [], world.bot_grid
+            )
+
+    timings = measure(run, setup, repeat=repeat, number=10)
+    world.close()
+    return summarize("update_rockets", {"bots": bots, "rockets": bots}, timings, unit="tick")
+
+
+def bench_ai(bots: int, repeat: int) -> dict:
+    world = World(1, scatter_bots(_arena_graph(), bots, random.Random(3)))
+    for _ in range(30):
+        world.update(1 / 60)
+
+    def run(_) -> None:
+        for bot in world.bots:
+            if bot.health <= 0:
+                continue
+            ai.update_bot_ai(
+                bot,
+                world.bots,
+                world.resources,
+                1 / 60,
+                world.obstacles,
+                world.nav,
+                world.flow_fields,
+                world.visibility,
+                bot_grid=world.bot_grid,
+                rng=world.rng,
+            )
+
+    timings = measure(run, repeat=repeat)
+    world.close()
+    return summarize("update_bot_ai", {"bots": bots}, timings, unit="tick")
+
+
+def bench_scenario(name: str, ticks: int) -> dict:
+    world = World(1, arena=scenario_arena(name, 1))
+    for _ in range(30):
+        world.update(1 / 60)
+    timings = []
+    for _ in range(ticks):
+        started = time.perf_counter()
+        world.update(1 / 60)
+        timings.append((time.perf_counter() - started) * 1000.0)
+    world.close()
+    params = {"scenario": name, "bots": len(world.bots), "nodes": len(world.nav)}
+    return summarize("scenario_update", params, timings, unit="tick")
+
+
+def bench_crowd(name: str, bots: int, ticks: int) -> dict:
+    arena = scenario_arena(name, 1)
+    graph = load_or_build_nav_graph(
+        ObstacleSet(arena.obstacles), bounds=arena.bounds, seed=arena.nav_seed
+    )
+    world = World(1, scatter_bots(graph, bots, random.Random(3)), arena=arena)
+    for _ in range(30):
+        world.update(1 / 60)
+    timings = []
+    for _ in range(ticks):
+        started = time.perf_counter()
+        world.update(1 / 60)
+        timings.append((time.perf_counter() - started) * 1000.0)
+    world.close()
+    params = {"scenario": name, "bots": bots, "store": BOT_ARRAY_STORE, "planner": NAV_PLANNER}
+    return summarize("crowd_update", params, timings, unit="tick")
+
+
+def bench_world(bots: int, ticks: int) -> dict:
+    world = World(1, scatter_bots(_arena_graph(), bots, random.Random(3)))
+    for _ in range(30):
+        world.update(1 / 60)
+    timings = []
+    for _ in range(ticks):
+        started = time.perf_counter()
+        world.update(1 / 60)
+        timings.append((time.perf_counter() - started) * 1000.0)
+    world.close()
+    return summarize("world_update", {"bots": bots}, timings, unit="tick")
+
+
+@functools.lru_cache(maxsize=None)
+def _arena_graph() -> NavGraph:
+    obstacles, bounds, seed = build_map("arena")
+    return generate_nav_graph(obstacles, bounds, seed)
+
+
+def run_suite(
+    sizes: list[str],
+    bot_counts: list[int],
+    repeat: int,
+    ticks: int,
+    scenarios: list[str] = (),
+    crowd: int = 0,
+) -> dict:
+    results = []
+    for size in sizes:
+        print(f"nav benchmarks on {size} map", file=sys.stderr)
+        results.extend(bench_nav(size, repeat))
+    for bots in bot_counts:
+        print(f"simulation benchmarks with {bots} bots", file=sys.stderr)
+        results.append(bench_rockets(bots, repeat))
+        results.append(bench_ai(bots, repeat))
+        results.append(bench_world(bots, ticks))
+    for name in scenarios:
+        print(f"scenario benchmark on {name} arena", file=sys.stderr)
+        results.append(bench_scenario(name, ticks))
+    if crowd > 0:
+        print(f"crowd benchmark with {crowd} bots on {CROWD_SCENARIO} arena", file=sys.stderr)
+        results.append(bench_crowd(CROWD_SCENARIO, crowd, ticks))
+    return {"meta": environment(), "results": results}
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def result_key(result: dict) -> str:
+    return f"{result['name']} {json.dumps(result['params'], sort_keys=True)}"
+
+
+def compare(baseline: dict, current: dict) -> list[tuple[str, float, float, float]]:
+    previous = {result_key(result): result for result in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        key = result_key(result)
+        if key not in previous:
+            continue
+        before = previous[key]["median_ms"]
+        after = result["median_ms"]
+        ratio = after / before if before > 0 else float("inf")
+        rows.append((key, before, after, ratio))
+    return rows
+
+
+def print_results(report: dict) -> None:
+    for result in report["results"]:
+        print(
+            f"{result_key(result):<60} median {result['median_ms']:10.4f} ms/{result['unit']}  "
+            f"p95 {result['p95_ms']:10.4f}"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark BotShooter nav, combat and tick hot paths.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run the suite and write results as JSON")
+    run.add_argument("--sizes", nargs="+", choices=list(MAP_SIZES), default=list(MAP_SIZES))
+    run.add_argument("--bots", nargs="+", type=int, default=list(BOT_COUNTS))
+    run.add_argument("--repeat", type=int, default=5)
+    run.add_argument("--ticks", type=int, default=120)
+    run.add_argument("--scenarios", nargs="*", choices=list(SCENARIOS), default=list(DEFAULT_SCENARIOS))
+    run.add_argument("--crowd", type=int, default=CROWD_BOTS, help="bots in the crowd case (0 skips it)")
+    run.add_argument("-o", "--output", default="benchmarks.json")
+
+    check = commands.add_parser("compare", help="flag regressions against a stored baseline")
+    check.add_argument("baseline")
+    check.add_argument("current")
+    check.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        report = run_suite(
+            args.sizes, args.bots, args.repeat, args.ticks, args.scenarios, args.crowd
+        )
+        with open(args.output, "w") as handle:
+            json.dump(report, handle, indent=2)
+        print_results(report)
+        print(f"-> {args.output}")
+        return 0
+
+    with open(args.baseline) as handle:
+        baseline = json.load(handle)
+    with open(args.current) as handle:
+        current = json.load(handle)
+    regressions = 0
+    for key, before, after, ratio in compare(baseline, current):
+        if ratio > 1.0 + args.threshold:
+            flag = "REGRESSION"
+            regressions += 1
+        elif ratio < 1.0 - args.threshold:
+            flag = "faster"
+        else:
+            flag = ""
+        print(f"{key:<60} {before:10.4f} -> {after:10.4f} ms  x{ratio:5.2f}  {flag}")
+    print(f"{regressions} regression(s) above {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
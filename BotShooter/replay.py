@@ -0,0 +1,5 @@
+from src.app.replay import main
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,15 +2,19 @@ from __future__ import annotations
 
 import random
 from collections import deque
+from collections.abc import Callable
 
 import pygame
 
-from src.core.config import BOT_FLEE_HEALTH
-from src.core.geometry import line_intersects_polygon
+from src.core.config import BOT_FLEE_HEALTH, NAV_SMOOTH_LOOKAHEAD, NAV_SMOOTH_PATHS
 from src.game.combat import is_reloading
 from src.game.entities import Bot, Resource
-from src.nav.astar import astar
-from src.nav.graph import NavGraph
+from src.game.spatial import SpatialHash
+from src.nav.astar import find_path
+from src.nav.flow_field import FlowField
+from src.nav.graph import NavGraph, NavNode
+from src.nav.smoothing import smooth_path_ahead
+from src.nav.visibility import VisibilityTable, line_of_sight
 
 STATE_SEEK = "seek_enemy"
 STATE_FLEE = "flee"
@@ -28,105 +32,155 @@ def update_bot_ai(
     dt: float,
     obstacles: list[list[pygame.Vector2]],
     nav: NavGraph,
+    flow_fields: dict[str, FlowField] | None = None,
+    visibility: VisibilityTable | None = None,
+    bot_grid: SpatialHash | None = None,
+    enemies: dict[int, Bot | None] | None = None,
+    rng: random.Random | None = None,
+    nodes: dict[int, NavNode | None] | None = None,
 ) -> None:
     if not hasattr(bot, "repath_timer"):
         bot.repath_timer = 0.0
+    node = None if nodes is None else nodes.get(bot.bot_id)
 
     bot.repath_timer -= dt
+    extend_route(bot, nav, obstacles)
     ammo_total = bot.ammo_rail + bot.ammo_rocket
-    enemy = closest_bot(bot, bots)
-    enemy_visible = enemy is not None and has_line_of_sight(bot.pos, enemy.pos, obstacles)
+    if enemies is not None:
+        enemy = enemies.get(bot.bot_id)
+    else:
+        enemy = closest_bot(bot, bots, bot_grid)
+    enemy_visible = enemy is not None and line_of_sight(
+        bot.pos, enemy.pos, obstacles, visibility
+    )
 
     if enemy and enemy_visible and is_reloading(bot) and ammo_total > 0:
         bot.state = STATE_RUN
         bot.target_id = enemy.bot_id
 
         if bot.repath_timer <= 0:
-            assign_flee_path(bot, nav, enemy)
+            assign_flee_path(bot, nav, enemy, obstacles, rng, node)
             bot.repath_timer = 0.5
 
         return
 
     if bot.health < BOT_FLEE_HEALTH:
         bot.target_id = enemy.bot_id if enemy else None
-        health_target = closest_resource_within_hops(
-            bot, resources, nav, max_hops=30, kind_filter=("health",)
-        )
+        if flow_fields is not None:
+            health_target = nearest_reachable_resource(
+                bot, nav, flow_fields, max_hops=30, kind_filter=("health",), start_node=node
+            )
+        else:
+            health_target = closest_resource_within_hops(
+                bot, resources, nav, max_hops=30, kind_filter=("health",)
+            )
         if health_target:
             bot.state = STATE_RUN
             if bot.repath_timer <= 0:
-                assign_path(bot, nav, health_target.pos)
+                if flow_fields is not None:
+                    assign_flow_path(bot, nav, flow_fields[health_target.kind], obstacles, node)
+                else:
+                    assign_path(bot, nav, health_target.pos, obstacles)
                 bot.repath_timer = 0.25
             return
 
         if ammo_total > 0 and enemy:
             bot.state = STATE_FIGHT_FOR_LIFE
             if bot.repath_timer <= 0:
-                assign_path(bot, nav, enemy.pos)
+                assign_path(bot, nav, enemy.pos, obstacles, chase=True)
                 bot.repath_timer = 0.2
             return
 
         bot.state = STATE_FLEE
         if enemy is not None:
             if bot.repath_timer <= 0:
-                assign_flee_path(bot, nav, enemy)
+                assign_flee_path(bot, nav, enemy, obstacles, rng, node)
                 bot.repath_timer = 0.4
         elif bot.path_target() is None:
-            assign_random_path(bot, nav)
+            assign_random_path(bot, nav, obstacles, rng, node)
         return
 
     if ammo_total <= 0:
         bot.state = STATE_GATHER
         bot.target_id = None
-        target = closest_resource(bot, resources, kind_filter=AMMO_RESOURCE_KINDS)
+        if flow_fields is not None:
+            target = nearest_reachable_resource(
+                bot, nav, flow_fields, kind_filter=AMMO_RESOURCE_KINDS, start_node=node
+            )
+        else:
+            target = closest_resource(bot, resources, kind_filter=AMMO_RESOURCE_KINDS)
         if target:
             if bot.repath_timer <= 0 or (
                 bot.goal and (bot.goal - target.pos).length_squared() > 1.0
             ):
-                assign_path(bot, nav, target.pos)
+                if flow_fields is not None:
+                    assign_flow_path(bot, nav, flow_fields[target.kind], obstacles, node)
+                else:
+                    assign_path(bot, nav, target.pos, obstacles)
                 bot.repath_timer = 0.5
         elif bot.path_target() is None:
-            assign_random_path(bot, nav)
+            assign_random_path(bot, nav, obstacles, rng, node)
         return
 
     if enemy and enemy_visible:
         bot.state = STATE_FIGHT
         bot.target_id = enemy.bot_id
         if bot.repath_timer <= 0:
-            assign_path(bot, nav, enemy.pos)
+            assign_path(bot, nav, enemy.pos, obstacles, chase=True)
             bot.repath_timer = 0.3
 
         if bot.path_target() is None:
-            assign_random_path(bot, nav)
+            assign_random_path(bot, nav, obstacles, rng, node)
         return
 
     bot.state = STATE_SEEK
     bot.target_id = None
     if enemy:
         if bot.repath_timer <= 0:
-            assign_path(bot, nav, enemy.pos)
-            bot.repath_timer = 0.25 + random.uniform(0, 0.1)
+            assign_path(bot, nav, enemy.pos, obstacles, chase=True)
+            bot.repath_timer = 0.25 + (rng or random).uniform(0, 0.1)
     elif bot.path_target() is None:
-        assign_random_path(bot, nav)
+        assign_random_path(bot, nav, obstacles, rng, node)
 
 
-def assign_random_path(bot: Bot, nav: NavGraph) -> None:
-    if not nav.nodes:
+def assign_random_path(
+    bot: Bot,
+    nav: NavGraph,
+    obstacles: list[list[pygame.Vector2]] | None = None,
+    rng: random.Random | None = None,
+    start_node: NavNode | None = None,
+) -> None:
+    if not len(nav):
         return
-    start_node = nav.nearest_node(bot.pos)
+    if start_node is None:
+        start_node = nav.nearest_node(bot.pos)
     if not start_node:
         return
-    if len(nav.nodes) == 1:
+    reachable = nav.reachable_indices(start_node.index)
+    if len(reachable) == 1:
+        cancel_path_request(bot, nav)
         bot.set_path([start_node.pos])
         return
-    goal_node = random.choice(nav.nodes)
-    if goal_node.index == start_node.index:
-        goal_node = random.choice(nav.nodes)
-    path_nodes = astar(nav, start_node, goal_node)
-    bot.set_path([node.pos for node in path_nodes])
-
-
-def assign_path(bot: Bot, nav: NavGraph, destination: pygame.Vector2) -> None:
+    rng = rng or random
+    goal = int(rng.choice(reachable))
+    if goal == start_node.index:
+        goal = int(rng.choice(reachable))
+    request_path(
+        bot,
+        nav,
+        start_node,
+        nav.node(goal),
+        lambda path_nodes: set_smoothed_path(bot, [node.pos for node in path_nodes], obstacles),
+    )
+
+
+def assign_path(
+    bot: Bot,
+    nav: NavGraph,
+    destination: pygame.Vector2,
+    obstacles: list[list[pygame.Vector2]] | None = None,
+    chase: bool = False,
+) -> None:
     if bot.goal and bot.path_target():
         dist_sq = (bot.goal - destination).length_squared()
         if dist_sq < 9.0:
@@ -149,17 +203,50 @@ def assign_path(bot: Bot, nav: NavGraph, destination: pygame.Vector2) -> None:
         return
 
     if start_node.index == goal_node.index:
+        cancel_path_request(bot, nav)
         bot.set_path([destination])
         bot.goal = destination
         return
 
-    path_nodes = astar(nav, start_node, goal_node)
-    path_points = [node.pos for node in path_nodes]
+    def finish(path_nodes: list[NavNode]) -> None:
+        path_points = [node.pos for node in path_nodes]
+        if path_points and path_nodes[-1].index == goal_node.index:
+            path_points[-1] = destination
+        set_smoothed_path(bot, path_points, obstacles)
+        bot.goal = destination
+
+    request_path(bot, nav, start_node, goal_node, finish, chase)
+    bot.goal = destination
+
 
-    if path_points:
-        path_points[-1] = destination
+def assign_flow_path(
+    bot: Bot,
+    nav: NavGraph,
+    field: FlowField,
+    obstacles: list[list[pygame.Vector2]] | None = None,
+    start_node: NavNode | None = None,
+) -> None:
+    if start_node is None:
+        start_node = nav.nearest_node(bot.pos)
+    if not start_node:
+        return
+    resource = field.nearest(start_node)
+    if resource is None:
+        return
+    destination = resource.pos
+    if bot.goal and bot.path_target():
+        if (bot.goal - destination).length_squared() < 9.0:
+            return
 
-    bot.set_path(path_points)
+    path_nodes = [start_node]
+    waypoint = field.next_waypoint(start_node)
+    while waypoint is not None:
+        path_nodes.append(waypoint)
+        waypoint = field.next_waypoint(waypoint)
+    cancel_path_request(bot, nav)
+    path_points = [node.pos for node in path_nodes]
+    path_points[-1] = destination
+    set_smoothed_path(bot, path_points, obstacles)
     bot.goal = destination
 
 
@@ -176,23 +263,151 @@ def closest_resource(
     return min(active, key=lambda r: (r.pos - bot.pos).length_squared())
 
 
-def closest_bot(bot: Bot, bots: list[Bot]) -> Bot | None:
+def nearest_reachable_resource(
+    bot: Bot,
+    nav: NavGraph,
+    flow_fields: dict[str, FlowField],
+    kind_filter: tuple[str, ...],
+    max_hops: int | None = None,
+    start_node: NavNode | None = None,
+) -> Resource | None:
+    node = nav.nearest_node(bot.pos) if start_node is None else start_node
+    if not node:
+        return None
+    best = None
+    best_dist = float("inf")
+    for kind in kind_filter:
+        field = flow_fields.get(kind)
+        if field is None:
+            continue
+        resource = field.nearest(node, max_hops)
+        if resource is not None and field.dist[node.index] < best_dist:
+            best = resource
+            best_dist = field.dist[node.index]
+    return best
+
+
+def closest_bot(bot: Bot, bots: list[Bot], bot_grid: SpatialHash | None = None) -> Bot | None:
+    if bot_grid is not None:
+        return bot_grid.nearest(bot.pos, lambda b: b.bot_id != bot.bot_id and b.health > 0)
     others = [b for b in bots if b.bot_id != bot.bot_id and b.health > 0]
     if not others:
         return None
     return min(others, key=lambda b: (b.pos - bot.pos).length_squared())
 
 
-def assign_flee_path(bot: Bot, nav: NavGraph, enemy: Bot) -> None:
-    if not nav.nodes:
+def assign_flee_path(
+    bot: Bot,
+    nav: NavGraph,
+    enemy: Bot,
+    obstacles: list[list[pygame.Vector2]] | None = None,
+    rng: random.Random | None = None,
+    start_node: NavNode | None = None,
+) -> None:
+    if not len(nav):
         return
-    start_node = nav.nearest_node(bot.pos)
+    if start_node is None:
+        start_node = nav.nearest_node(bot.pos)
     if not start_node:
         return
-    sample = nav.nodes if len(nav.nodes) <= 80 else random.sample(nav.nodes, 80)
-    goal_node = max(sample, key=lambda n: (n.pos - enemy.pos).length_squared())
-    path_nodes = astar(nav, start_node, goal_node)
-    bot.set_path([node.pos for node in path_nodes])
+    reachable = nav.reachable_indices(start_node.index)
+    if len(reachable) > 80:
+        reachable = [reachable[i] for i in (rng or random).sample(range(len(reachable)), 80)]
+    xs = nav.xs
+    ys = nav.ys
+    ex = enemy.pos.x
+    ey = enemy.pos.y
+    goal = max(reachable, key=lambda i: (xs[i] - ex) ** 2 + (ys[i] - ey) ** 2)
+    request_path(
+        bot,
+        nav,
+        start_node,
+        nav.node(int(goal)),
+        lambda path_nodes: set_smoothed_path(bot, [node.pos for node in path_nodes], obstacles),
+    )
+
+
+def request_path(
+    bot: Bot,
+    nav: NavGraph,
+    start_node: NavNode,
+    goal_node: NavNode,
+    finish: Callable[[list[NavNode]], None],
+    chase: bool = False,
+) -> None:
+    if chase and nav.adaptive is not None:
+        cancel_path_request(bot, nav)
+        finish(nav.adaptive.find_path(bot.bot_id, start_node, goal_node))
+        return
+    hierarchy = nav.hierarchy
+    if (
+        hierarchy is not None
+        and hierarchy.version == nav.version
+        and nav.distance(start_node.index, goal_node.index) > hierarchy.cluster_size * nav.step
+    ):
+        route = hierarchy.abstract_path(start_node.index, goal_node.index)
+        if len(route) > 2:
+            goal = goal_node.pos
+            finish_route = finish
+
+            def finish(path_nodes: list[NavNode]) -> None:
+                finish_route(path_nodes)
+                if path_nodes:
+                    bot.route = route[1:]
+                    bot.goal = goal
+
+            goal_node = nav.node(route[1])
+    service = nav.path_service
+    if service is None:
+        finish(find_path(nav, start_node, goal_node))
+        return
+
+    def deliver(path_nodes: list[NavNode]) -> None:
+        if bot.health > 0:
+            finish(path_nodes)
+
+    service.request(bot.bot_id, start_node, goal_node, deliver)
+
+
+def extend_route(
+    bot: Bot, nav: NavGraph, obstacles: list[list[pygame.Vector2]] | None = None
+) -> None:
+    route = bot.route
+    if not route or bot.path_index < len(bot.path) - 1:
+        return
+    hierarchy = nav.hierarchy
+    segment = []
+    if hierarchy is not None and hierarchy.version == nav.version:
+        segment = hierarchy.refine(route[0], route[1])
+    goal = bot.goal
+    if not segment:
+        bot.set_path([])
+        if goal is not None:
+            assign_path(bot, nav, goal, obstacles)
+        return
+
+    points = [nav.node(index).pos for index in segment]
+    if len(route) == 2 and goal is not None:
+        points[-1] = goal
+    if obstacles is not None and NAV_SMOOTH_PATHS:
+        points = smooth_path_ahead(points, obstacles, bot.radius, NAV_SMOOTH_LOOKAHEAD)
+    bot.path = [*bot.path, *points[1:]]
+    bot.route = route[1:] if len(route) > 2 else []
+
+
+def cancel_path_request(bot: Bot, nav: NavGraph) -> None:
+    if nav.path_service is not None:
+        nav.path_service.cancel(bot.bot_id)
+
+
+def set_smoothed_path(
+    bot: Bot, points: list[pygame.Vector2], obstacles: list[list[pygame.Vector2]] | None
+) -> None:
+    if obstacles is not None and NAV_SMOOTH_PATHS and points:
+        points = smooth_path_ahead(
+            [bot.pos, *points], obstacles, bot.radius, NAV_SMOOTH_LOOKAHEAD
+        )[1:]
+    bot.set_path(points)
 
 
 def closest_resource_within_hops(
@@ -205,13 +420,16 @@ def closest_resource_within_hops(
     start_node = nav.nearest_node(bot.pos)
     if not start_node:
         return None
-    resource_nodes: list[tuple[Resource, int]] = []
-    for resource in resources:
-        if not resource.active or resource.kind not in kind_filter:
-            continue
-        node = nav.nearest_node(resource.pos)
-        if node:
-            resource_nodes.append((resource, node.index))
+    candidates = [
+        resource
+        for resource in resources
+        if resource.active and resource.kind in kind_filter
+    ]
+    resource_nodes: list[tuple[Resource, int]] = [
+        (resource, node.index)
+        for resource, node in zip(candidates, nav.nearest_nodes([r.pos for r in candidates]))
+        if node
+    ]
     if not resource_nodes:
         return None
 
@@ -235,12 +453,3 @@ def closest_resource_within_hops(
     if not hits:
         return None
     return min(hits, key=lambda r: (r.pos - bot.pos).length_squared())
-
-
-def has_line_of_sight(
-    start: pygame.Vector2, end: pygame.Vector2, obstacles: list[list[pygame.Vector2]]
-) -> bool:
-    for poly in obstacles:
-        if line_intersects_polygon(start, end, poly):
-            return False
-    return True
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from src.core.config import HEADLESS_DT, HEADLESS_MATCH_TIME_LIMIT, HEADLESS_RESULTS_PATH
+from src.game.arena import SCENARIOS, scenario_arena
+from src.game.world import World
+
+
+def run_match(
+    match_id: int,
+    seed: int,
+    dt: float,
+    time_limit: float,
+    profile_dir: str | None = None,
+    scenario: str | None = None,
+) -> dict:
+    world = World(seed, arena=None if scenario is None else scenario_arena(scenario, seed))
+    profiler = world.profiler
+    if profile_dir is not None:
+        profiler.enabled = True
+        profiler.record = True
+    ticks = 0
+    started = time.perf_counter()
+    try:
+        while world.winner_id is None and world.time < time_limit:
+            with profiler.phase("update"):
+                world.update(dt)
+            profiler.end_frame()
+            ticks += 1
+    finally:
+        world.close()
+    elapsed = time.perf_counter() - started
+    if profile_dir is not None:
+        profiler.export_csv(os.path.join(profile_dir, f"profile_{match_id}.csv"))
+
+    return {
+        "match": match_id,
+        "seed": seed,
+        "scenario": scenario,
+        "winner": world.winner_id,
+        "kills": {bot.bot_id: bot.kills for bot in world.bots},
+        "deaths": {bot.bot_id: bot.deaths for bot in world.bots},
+        "match_time": round(world.time, 4),
+        "ticks": ticks,
+        "ticks_per_sec": round(ticks / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+
+
+def run_batch(
+    matches: int,
+    *,
+    workers: int | None = None,
+    seed: int = 0,
+    dt: float = HEADLESS_DT,
+    time_limit: float = HEADLESS_MATCH_TIME_LIMIT,
+    output: str = HEADLESS_RESULTS_PATH,
+    profile_dir: str | None = None,
+    scenario: str | None = None,
+) -> list[dict]:
+    results: list[dict] = []
+    if profile_dir is not None:
+        os.makedirs(profile_dir, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=workers) as pool, open(output, "w") as handle:
+        futures = [
+            pool.submit(
+                run_match, match_id, seed + match_id, dt, time_limit, profile_dir, scenario
+            )
+            for match_id in range(matches)
+        ]
+        for future in futures:
+            result = future.result()
+            handle.write(json.dumps(result) + "\n")
+            results.append(result)
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Run BotShooter matches without a display.")
+    parser.add_argument("-n", "--matches", type=int, default=1)
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--dt", type=float, default=HEADLESS_DT)
+    parser.add_argument("--time-limit", type=float, default=HEADLESS_MATCH_TIME_LIMIT)
+    parser.add_argument("-o", "--output", default=HEADLESS_RESULTS_PATH)
+    parser.add_argument("--profile", metavar="DIR", help="write per-tick phase timings as CSV")
+    parser.add_argument(
+        "--scenario", choices=list(SCENARIOS), help="play on a generated arena instead of the default map"
+    )
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    results = run_batch(
+        args.matches,
+        workers=args.workers,
+        seed=args.seed,
+        dt=args.dt,
+        time_limit=args.time_limit,
+        output=args.output,
+        profile_dir=args.profile,
+        scenario=args.scenario,
+    )
+    elapsed = time.perf_counter() - started
+
+    wins: dict[int | None, int] = {}
+    for result in results:
+        wins[result["winner"]] = wins.get(result["winner"], 0) + 1
+    print(f"{len(results)} matches in {elapsed:.1f}s -> {args.output}")
+    for winner, count in sorted(wins.items(), key=lambda item: (item[0] is None, item[0])):
+        label = "draw" if winner is None else f"Bot {winner}"
+        print(f"  {label}: {count}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,15 +1,24 @@
 import pygame
 
 from src.core.config import (
-    COLOR_BG,
     DEBUG_DRAW_NAV,
     DEBUG_DRAW_PATHS,
+    DEBUG_DRAW_PROFILER,
     DEBUG_DRAW_STATE,
     FONT_NAME,
     FONT_SIZE,
     FPS,
+    SIM_DT,
+    SIM_FAST_FORWARD_RENDER_EVERY,
+    SIM_FAST_FORWARD_SPEED,
+    SIM_FIXED_TIMESTEP,
+    SIM_INTERPOLATE,
+    SIM_MAX_STEPS,
+    SIM_SEED,
     WINDOW_SIZE,
 )
+from src.core.profiler import FrameProfiler
+from src.game.render_cache import TextCache
 from src.game.world import World
 
 
@@ -21,72 +30,153 @@ def main() -> int:
     font = pygame.font.SysFont(FONT_NAME, FONT_SIZE)
     font_bold = pygame.font.SysFont(FONT_NAME, FONT_SIZE, bold=True)
 
-    world = World()
+    world = World(SIM_SEED)
+    profiler = world.profiler
+    show_profiler = DEBUG_DRAW_PROFILER
+    hud = HudLayout()
+    accumulator = 0.0
+    speed = 1
+    render_every = 1
+    ticks = 0
+    rendered_at = 0
+    skipped = 0
     running = True
     while running:
         dt = clock.tick(FPS) / 1000.0
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                show_profiler = not show_profiler
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_TAB:
+                fast = speed == 1
+                speed = SIM_FAST_FORWARD_SPEED if fast else 1
+                render_every = SIM_FAST_FORWARD_RENDER_EVERY if fast else 1
 
-        world.update(dt)
+        interpolation = 1.0
+        with profiler.phase("update"):
+            if SIM_FIXED_TIMESTEP:
+                max_steps = SIM_MAX_STEPS * speed
+                accumulator = min(accumulator + dt * speed, SIM_DT * max_steps * 2)
+                steps = 0
+                while accumulator >= SIM_DT and steps < max_steps:
+                    if SIM_INTERPOLATE:
+                        world.remember_positions()
+                    world.update(SIM_DT)
+                    accumulator -= SIM_DT
+                    steps += 1
+                ticks += steps
+                behind = accumulator >= SIM_DT
+                if SIM_INTERPOLATE and not behind:
+                    interpolation = accumulator / SIM_DT
+            else:
+                world.update(dt)
+                ticks += 1
+                behind = False
 
-        screen.fill(COLOR_BG)
-        world.draw(screen, font)
-        if DEBUG_DRAW_NAV or DEBUG_DRAW_PATHS:
-            world.draw_debug(screen, draw_nav=DEBUG_DRAW_NAV, draw_paths=DEBUG_DRAW_PATHS)
-        if DEBUG_DRAW_STATE:
-            draw_hud(screen, font, font_bold, world)
-        pygame.display.flip()
+        due = render_every <= 1 or ticks - rendered_at >= render_every
+        if not due or (behind and skipped < SIM_MAX_STEPS):
+            skipped += 1
+            profiler.end_frame()
+            continue
+        rendered_at = ticks
+        skipped = 0
 
+        with profiler.phase("draw"):
+            world.draw(screen, font, draw_nav=DEBUG_DRAW_NAV, interpolation=interpolation)
+            if DEBUG_DRAW_PATHS:
+                world.draw_debug(screen, draw_nav=False, draw_paths=True)
+            if DEBUG_DRAW_STATE:
+                draw_hud(screen, font, font_bold, world, hud)
+            if show_profiler:
+                draw_profiler(screen, font, profiler, world.text_cache)
+        with profiler.phase("flip"):
+            pygame.display.flip()
+        profiler.end_frame()
+
+    world.close()
     pygame.quit()
     return 0
 
 
+class HudLayout:
+    def __init__(self) -> None:
+        self.key: tuple | None = None
+        self.col_x: list[int] = []
+
+
 def draw_hud(
     screen: pygame.Surface,
     font: pygame.font.Font,
     font_bold: pygame.font.Font,
     world: World,
+    layout: HudLayout | None = None,
 ) -> None:
     x, y = 12, 12
     padding = 10
+    text = world.text_cache
     rows = []
     for bot in world.bots:
         status = "waiting for respawn" if bot.health <= 0 else bot.state
         rows.append(
-            [
+            (
                 ("Bot", f"{bot.bot_id}", font, font_bold),
                 ("HP", f"{bot.health}", font, font_bold),
                 ("Ray ammo", f"{bot.ammo_rail}", font, font_bold),
                 ("Rocket ammo", f"{bot.ammo_rocket}", font, font_bold),
                 ("Kills", f"{bot.kills}", font, font_bold),
                 ("Behavior", status, font, font_bold),
-            ]
+            )
         )
 
-    col_widths = [0] * len(rows[0]) if rows else []
-    for row in rows:
-        for idx, (label_text, value_text, label_font, value_font) in enumerate(row):
-            label_surf = label_font.render(label_text, True, (210, 220, 230))
-            value_surf = value_font.render(value_text, True, (240, 240, 255))
-            col_widths[idx] = max(col_widths[idx], label_surf.get_width() + 6 + value_surf.get_width())
+    key = tuple(rows)
+    if layout is not None and layout.key == key:
+        col_x = layout.col_x
+    else:
+        col_widths = [0] * len(rows[0]) if rows else []
+        for row in rows:
+            for idx, (label_text, value_text, label_font, value_font) in enumerate(row):
+                label_surf = text.render(label_font, label_text, (210, 220, 230))
+                value_surf = text.render(value_font, value_text, (240, 240, 255))
+                col_widths[idx] = max(col_widths[idx], label_surf.get_width() + 6 + value_surf.get_width())
 
-    col_x = []
-    cursor_x = x
-    for width in col_widths:
-        col_x.append(cursor_x)
-        cursor_x += width + padding
+        col_x = []
+        cursor_x = x
+        for width in col_widths:
+            col_x.append(cursor_x)
+            cursor_x += width + padding
+        if layout is not None:
+            layout.key = key
+            layout.col_x = col_x
 
     for row in rows:
         for idx, (label_text, value_text, label_font, value_font) in enumerate(row):
             base_x = col_x[idx]
-            label = label_font.render(label_text, True, (210, 220, 230))
+            label = text.render(label_font, label_text, (210, 220, 230))
             screen.blit(label, (base_x, y))
-            value = value_font.render(value_text, True, (240, 240, 255))
+            value = text.render(value_font, value_text, (240, 240, 255))
             screen.blit(value, (base_x + label.get_width() + 6, y))
         y += 18
 
 
+def draw_profiler(
+    screen: pygame.Surface, font: pygame.font.Font, profiler: FrameProfiler, text: TextCache
+) -> None:
+    x = WINDOW_SIZE[0] - 330
+    y = 12
+    color = (240, 240, 255)
+    header = text.render(font, f"{'phase':<14}{'p50':>9}{'p95':>9}{'p99':>9}", (210, 220, 230))
+    screen.blit(header, (x, y))
+    if not profiler.enabled:
+        screen.blit(text.render(font, "profiler disabled (PROFILE_ENABLED)", color), (x, y + 16))
+        return
+    for name in profiler.names():
+        y += 16
+        unit = "ms" if name in profiler.timed else ""
+        p50, p95, p99 = profiler.percentiles(name)
+        row = f"{name:<14}{p50:>7.2f}{unit:2}{p95:>7.2f}{unit:2}{p99:>7.2f}{unit:2}"
+        screen.blit(text.render(font, row, color), (x, y))
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import argparse
+import time
+
+from src.core.config import HEADLESS_DT, REPLAY_PATH
+from src.game.replay import Replay, config_differences, record_replay, verify_replay
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Record and verify deterministic BotShooter replays.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record = commands.add_parser("record", help="simulate a match and store per-tick checksums")
+    record.add_argument("--seed", type=int, default=0)
+    record.add_argument("--ticks", type=int, default=3600)
+    record.add_argument("--dt", type=float, default=HEADLESS_DT)
+    record.add_argument("-o", "--output", default=REPLAY_PATH)
+
+    verify = commands.add_parser("verify", help="re-simulate a replay and compare checksums")
+    verify.add_argument("path", nargs="?", default=REPLAY_PATH)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    if args.command == "record":
+        replay = record_replay(args.seed, args.ticks, args.dt)
+        replay.save(args.output)
+        elapsed = time.perf_counter() - started
+        print(f"recorded {len(replay)} ticks (seed {replay.seed}) in {elapsed:.2f}s -> {args.output}")
+        return 0
+
+    replay = Replay.load(args.path)
+    changed = config_differences(replay)
+    if changed:
+        print(f"config differs from recording: {', '.join(changed)}")
+    diverged = verify_replay(replay)
+    elapsed = time.perf_counter() - started
+    if diverged is not None:
+        print(f"replay diverged at tick {diverged} of {len(replay)}")
+        return 1
+    print(f"replay verified: {len(replay)} ticks in {elapsed:.2f}s")
+    return 0
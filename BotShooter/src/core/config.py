@@ -5,6 +5,23 @@ import pygame
 WINDOW_SIZE = (900, 600)
 FPS = 60
 
+HEADLESS_DT = 1.0 / FPS
+HEADLESS_MATCH_TIME_LIMIT = 300.0
+HEADLESS_RESULTS_PATH = "results.jsonl"
+
+SIM_SEED: int | None = None
+SIM_FIXED_TIMESTEP = True
+SIM_DT = 1.0 / FPS
+SIM_MAX_STEPS = 5
+SIM_INTERPOLATE = True
+SIM_SNAP_DISTANCE = 64.0
+SIM_FAST_FORWARD_SPEED = 8
+SIM_FAST_FORWARD_RENDER_EVERY = 8
+REPLAY_PATH = "match.replay"
+
+PROFILE_ENABLED = False
+PROFILE_WINDOW = 300
+
 BOT_RADIUS = 10
 BOT_SPEED = 90.0
 BOT_MAX_HEALTH = 100
@@ -29,6 +46,29 @@ RAIL_BEAM_TIME = 0.12
 
 NAV_SEED = pygame.Vector2(80, 80)
 NAV_STEP = BOT_RADIUS
+NAV_BUILDER = "raster"
+NAV_CACHE_DIR = ".navcache"
+NAV_PLANNER = "astar"
+NAV_HPA_CLUSTER_SIZE = 10
+NAV_HEURISTIC = "euclidean"
+NAV_LANDMARKS = 8
+NAV_PATH_CACHE_SIZE = 512
+NAV_SMOOTH_PATHS = True
+NAV_SMOOTH_LOOKAHEAD = 24
+NAV_VISIBILITY = False
+NAV_VISIBILITY_WORKERS = 0
+NAV_PATH_SERVICE = False
+NAV_PATH_WORKERS = 0
+NAV_PATH_EXECUTOR = "thread"
+NAV_PATH_BUDGET = 8
+NAV_ADAPTIVE_CHASE = False
+NAV_ADAPTIVE_MEMORY = 20000
+
+OBSTACLE_GRID_CELL = 64
+SPATIAL_CELL_SIZE = 64
+BOT_ARRAY_STORE = False
+
+TEXT_CACHE_SIZE = 256
 
 COLOR_BG = (22, 28, 36)
 COLOR_WALL = (70, 85, 96)
@@ -46,12 +86,17 @@ MAP_BOUNDS = pygame.Rect(
     WINDOW_SIZE[1] - MAP_BOUNDS_PADDING * 2,
 )
 
+ARENA_MAX_SIZE = 10_000
+ARENA_OBSTACLE_SIZE = (40, 260)
+ARENA_OBSTACLE_GAP = BOT_RADIUS * 2 + NAV_STEP * 3
+
 FONT_NAME = "georgia"
 FONT_SIZE = 16
 
 DEBUG_DRAW_NAV = True
 DEBUG_DRAW_PATHS = True
 DEBUG_DRAW_STATE = True
+DEBUG_DRAW_PROFILER = False
 
 EPS = 1e-5
 TAU = math.tau
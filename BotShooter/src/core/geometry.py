@@ -2,7 +2,7 @@ import math
 
 import pygame
 
-from .config import EPS
+from .config import EPS, OBSTACLE_GRID_CELL
 
 
 def distance_point_to_segment(point: pygame.Vector2, a: pygame.Vector2, b: pygame.Vector2) -> float:
@@ -66,6 +66,35 @@ def line_intersects_polygon(
     return False
 
 
+def segment_clear_of_polygon(
+    start: pygame.Vector2, end: pygame.Vector2, polygon: list[pygame.Vector2], clearance: float
+) -> bool:
+    if line_intersects_polygon(start, end, polygon):
+        return False
+    count = len(polygon)
+    for i in range(count):
+        a = polygon[i]
+        b = polygon[(i + 1) % count]
+        if (
+            distance_point_to_segment(a, start, end) <= clearance
+            or distance_point_to_segment(start, a, b) <= clearance
+            or distance_point_to_segment(end, a, b) <= clearance
+        ):
+            return False
+    return True
+
+
+def has_line_of_sight(
+    start: pygame.Vector2, end: pygame.Vector2, obstacles: list[list[pygame.Vector2]]
+) -> bool:
+    if isinstance(obstacles, ObstacleSet):
+        return not obstacles.segment_blocked(start, end)
+    for poly in obstacles:
+        if line_intersects_polygon(start, end, poly):
+            return False
+    return True
+
+
 def segments_intersect(a1: pygame.Vector2, a2: pygame.Vector2, b1: pygame.Vector2, b2: pygame.Vector2) -> bool:
     def ccw(p1: pygame.Vector2, p2: pygame.Vector2, p3: pygame.Vector2) -> bool:
         return (p3.y - p1.y) * (p2.x - p1.x) > (p2.y - p1.y) * (p3.x - p1.x)
@@ -79,3 +108,159 @@ def rotate_vector(vector: pygame.Vector2, degrees: float) -> pygame.Vector2:
         vector.x * math.cos(radians) - vector.y * math.sin(radians),
         vector.x * math.sin(radians) + vector.y * math.cos(radians),
     )
+
+
+class ObstacleSet(list):
+    def __init__(self, polygons=(), cell_size: float = OBSTACLE_GRID_CELL):
+        super().__init__(polygons)
+        self.cell_size = cell_size
+        self.segment_queries = 0
+        self.version = -1
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        self.version += 1
+        self.boxes: list[tuple[float, float, float, float]] = []
+        self.edges: list[tuple[pygame.Vector2, pygame.Vector2, int]] = []
+        self.edge_cells: dict[tuple[int, int], list[int]] = {}
+        self.polygon_cells: dict[tuple[int, int], list[int]] = {}
+        for index, poly in enumerate(self):
+            xs = [p.x for p in poly]
+            ys = [p.y for p in poly]
+            box = (min(xs), min(ys), max(xs), max(ys))
+            self.boxes.append(box)
+            for cell in self._box_cells(*box):
+                self.polygon_cells.setdefault(cell, []).append(index)
+            count = len(poly)
+            for i in range(count):
+                a = poly[i]
+                b = poly[(i + 1) % count]
+                edge_index = len(self.edges)
+                self.edges.append((a, b, index))
+                box = (min(a.x, b.x), min(a.y, b.y), max(a.x, b.x), max(a.y, b.y))
+                for cell in self._box_cells(*box):
+                    self.edge_cells.setdefault(cell, []).append(edge_index)
+
+    def _box_cells(
+        self, min_x: float, min_y: float, max_x: float, max_y: float
+    ) -> list[tuple[int, int]]:
+        size = self.cell_size
+        x0 = math.floor((min_x - EPS) / size)
+        y0 = math.floor((min_y - EPS) / size)
+        x1 = math.floor((max_x + EPS) / size)
+        y1 = math.floor((max_y + EPS) / size)
+        return [(cx, cy) for cx in range(x0, x1 + 1) for cy in range(y0, y1 + 1)]
+
+    def _segment_cells(self, start: pygame.Vector2, end: pygame.Vector2) -> list[tuple[int, int]]:
+        size = self.cell_size
+        cx = math.floor(start.x / size)
+        cy = math.floor(start.y / size)
+        end_x = math.floor(end.x / size)
+        end_y = math.floor(end.y / size)
+        dx = end.x - start.x
+        dy = end.y - start.y
+        step_x = 1 if dx > 0 else -1
+        step_y = 1 if dy > 0 else -1
+        if dx:
+            next_x = ((cx + (dx > 0)) * size - start.x) / dx
+            delta_x = size / abs(dx)
+        else:
+            next_x = delta_x = math.inf
+        if dy:
+            next_y = ((cy + (dy > 0)) * size - start.y) / dy
+            delta_y = size / abs(dy)
+        else:
+            next_y = delta_y = math.inf
+
+        cells = [(cx, cy)]
+        for _ in range(abs(end_x - cx) + abs(end_y - cy)):
+            if next_x < next_y:
+                cx += step_x
+                next_x += delta_x
+            else:
+                cy += step_y
+                next_y += delta_y
+            cells.append((cx, cy))
+        if cells[-1] != (end_x, end_y):
+            cells.append((end_x, end_y))
+        return cells
+
+    def _polygons_at(self, point: pygame.Vector2, margin: float = 0.0) -> list[int]:
+        size = self.cell_size
+        cell = (math.floor(point.x / size), math.floor(point.y / size))
+        if margin <= 0.0:
+            candidates = self.polygon_cells.get(cell, ())
+        else:
+            candidates = {
+                index
+                for near in self._box_cells(
+                    point.x - margin, point.y - margin, point.x + margin, point.y + margin
+                )
+                for index in self.polygon_cells.get(near, ())
+            }
+        found = []
+        for index in candidates:
+            min_x, min_y, max_x, max_y = self.boxes[index]
+            if (
+                min_x - margin <= point.x <= max_x + margin
+                and min_y - margin <= point.y <= max_y + margin
+            ):
+                found.append(index)
+        return found
+
+    def point_blocked(self, point: pygame.Vector2) -> bool:
+        for index in self._polygons_at(point):
+            if point_in_polygon(point, self[index]):
+                return True
+        return False
+
+    def circle_blocked(self, center: pygame.Vector2, radius: float) -> bool:
+        if self.point_blocked(center):
+            return True
+        seen: set[int] = set()
+        for cell in self._box_cells(
+            center.x - radius, center.y - radius, center.x + radius, center.y + radius
+        ):
+            for edge_index in self.edge_cells.get(cell, ()):
+                if edge_index in seen:
+                    continue
+                seen.add(edge_index)
+                a, b, _ = self.edges[edge_index]
+                if distance_point_to_segment(center, a, b) <= radius:
+                    return True
+        return False
+
+    def segment_blocked(self, start: pygame.Vector2, end: pygame.Vector2) -> bool:
+        self.segment_queries += 1
+        if self.point_blocked(start) or self.point_blocked(end):
+            return True
+        sx, sy, ex, ey = start.x, start.y, end.x, end.y
+        dx = ex - sx
+        dy = ey - sy
+        edges = self.edges
+        edge_cells = self.edge_cells
+        seen: set[int] = set()
+        for cell in self._segment_cells(start, end):
+            for edge_index in edge_cells.get(cell, ()):
+                if edge_index in seen:
+                    continue
+                seen.add(edge_index)
+                a, b, _ = edges[edge_index]
+                ax, ay, bx, by = a.x, a.y, b.x, b.y
+                if ((by - sy) * (ax - sx) > (ay - sy) * (bx - sx)) != (
+                    (by - ey) * (ax - ex) > (ay - ey) * (bx - ex)
+                ) and ((ay - sy) * dx > dy * (ax - sx)) != ((by - sy) * dx > dy * (bx - sx)):
+                    return True
+        return False
+
+    def segment_clear(self, start: pygame.Vector2, end: pygame.Vector2, clearance: float) -> bool:
+        low_x = min(start.x, end.x) - clearance
+        low_y = min(start.y, end.y) - clearance
+        high_x = max(start.x, end.x) + clearance
+        high_y = max(start.y, end.y) + clearance
+        for index, (min_x, min_y, max_x, max_y) in enumerate(self.boxes):
+            if max_x < low_x or min_x > high_x or max_y < low_y or min_y > high_y:
+                continue
+            if not segment_clear_of_polygon(start, end, self[index], clearance):
+                return False
+        return True
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import csv
+import time
+from collections import deque
+
+
+class _NullScope:
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+
+NULL_SCOPE = _NullScope()
+
+
+class _Scope:
+    __slots__ = ("profiler", "name", "started")
+
+    def __init__(self, profiler: FrameProfiler, name: str):
+        self.profiler = profiler
+        self.name = name
+        self.started = 0.0
+
+    def __enter__(self) -> None:
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc) -> None:
+        elapsed = (time.perf_counter() - self.started) * 1000.0
+        frame = self.profiler.frame
+        frame[self.name] = frame.get(self.name, 0.0) + elapsed
+
+
+class FrameProfiler:
+    def __init__(self, enabled: bool = False, window: int = 300, record: bool = False):
+        self.enabled = enabled
+        self.window = window
+        self.record = record
+        self.frames = 0
+        self.frame: dict[str, float] = {}
+        self.counts: dict[str, float] = {}
+        self.history: dict[str, deque[float]] = {}
+        self.timed: set[str] = set()
+        self.rows: list[dict[str, float]] = []
+
+    def phase(self, name: str) -> _Scope | _NullScope:
+        if not self.enabled:
+            return NULL_SCOPE
+        return _Scope(self, name)
+
+    def count(self, name: str, amount: float = 1) -> None:
+        if self.enabled:
+            self.counts[name] = self.counts.get(name, 0) + amount
+
+    def end_frame(self) -> None:
+        if not self.enabled:
+            return
+        self.frames += 1
+        self.timed.update(self.frame)
+        values = {**self.frame, **self.counts}
+        for name in self.history.keys() - values.keys():
+            self.history[name].append(0.0)
+        for name, value in values.items():
+            samples = self.history.get(name)
+            if samples is None:
+                samples = self.history[name] = deque(maxlen=self.window)
+            samples.append(value)
+        if self.record:
+            self.rows.append({"frame": self.frames, **values})
+        self.frame = {}
+        self.counts = {}
+
+    def percentiles(self, name: str) -> tuple[float, float, float]:
+        samples = sorted(self.history.get(name, ()))
+        if not samples:
+            return (0.0, 0.0, 0.0)
+        last = len(samples) - 1
+        return (
+            samples[int(last * 0.50)],
+            samples[int(last * 0.95)],
+            samples[int(last * 0.99)],
+        )
+
+    def names(self) -> list[str]:
+        return list(self.history)
+
+    def export_csv(self, path: str) -> None:
+        columns = ["frame", *self.history]
+        with open(path, "w", newline="") as handle:
+            writer = csv.DictWriter(handle, columns, restval=0)
+            writer.writeheader()
+            writer.writerows(self.rows)
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import math
+import random
+from dataclasses import dataclass, field
+
+import pygame
+
+from src.core.config import (
+    ARENA_MAX_SIZE,
+    ARENA_OBSTACLE_GAP,
+    ARENA_OBSTACLE_SIZE,
+    BOT_RADIUS,
+    MAP_BOUNDS_PADDING,
+    NAV_STEP,
+)
+from src.game.entities import Bot
+
+PICKUP_KINDS = ("health", "rail_ammo", "rocket_ammo")
+PICKUP_WEIGHTS = (3, 5, 4)
+
+
+@dataclass(frozen=True)
+class ArenaSpec:
+    width: int
+    height: int
+    obstacles: int
+    complexity: int = 6
+    bots: int = 4
+    pickup_density: float = 20.0
+
+
+@dataclass
+class Arena:
+    bounds: pygame.Rect
+    obstacles: list[list[pygame.Vector2]]
+    spawns: list[pygame.Vector2]
+    pickups: list[tuple[str, pygame.Vector2]] = field(default_factory=list)
+
+    @property
+    def nav_seed(self) -> pygame.Vector2:
+        return self.spawns[0]
+
+    def spawn_bots(self) -> list[Bot]:
+        return [
+            Bot(bot_id=i, pos=pos.copy(), spawn_pos=pos.copy())
+            for i, pos in enumerate(self.spawns, start=1)
+        ]
+
+
+SCENARIOS = {
+    "small": ArenaSpec(900, 600, obstacles=8, complexity=6, bots=4, pickup_density=22.0),
+    "medium": ArenaSpec(3000, 2000, obstacles=100, complexity=8, bots=32, pickup_density=12.0),
+    "huge": ArenaSpec(10000, 10000, obstacles=1200, complexity=10, bots=128, pickup_density=4.0),
+}
+
+
+def scenario_arena(name: str, seed: int) -> Arena:
+    return generate_arena(SCENARIOS[name], seed)
+
+
+def generate_arena(spec: ArenaSpec, seed: int) -> Arena:
+    if not 0 < spec.width <= ARENA_MAX_SIZE or not 0 < spec.height <= ARENA_MAX_SIZE:
+        raise ValueError(f"arena size must be within 1..{ARENA_MAX_SIZE}")
+    rng = random.Random(seed)
+    padding = MAP_BOUNDS_PADDING
+    bounds = pygame.Rect(padding, padding, spec.width - padding * 2, spec.height - padding * 2)
+    min_size, max_size = ARENA_OBSTACLE_SIZE
+    max_size = min(max_size, bounds.width // 3, bounds.height // 3)
+    min_size = min(min_size, max_size)
+    gap = ARENA_OBSTACLE_GAP
+
+    placed = _BoxGrid(max_size + gap)
+    obstacles = []
+    attempts = spec.obstacles * 20
+    while len(obstacles) < spec.obstacles and attempts > 0:
+        attempts -= 1
+        size = rng.uniform(min_size, max_size)
+        x = rng.uniform(bounds.left + gap, bounds.right - gap - size)
+        y = rng.uniform(bounds.top + gap, bounds.bottom - gap - size)
+        box = pygame.Rect(round(x), round(y), math.ceil(size), math.ceil(size))
+        if placed.collides(box.inflate(gap * 2, gap * 2)):
+            continue
+        placed.add(box)
+        obstacles.append(_random_polygon(box, rng.randint(3, max(3, spec.complexity)), rng))
+
+    clearance = BOT_RADIUS + NAV_STEP
+    spawns = _free_points(spec.bots, bounds, placed, clearance, BOT_RADIUS * 4, rng)
+    if not spawns:
+        raise ValueError("arena has no free space for spawns")
+    count = max(len(PICKUP_KINDS), round(bounds.width * bounds.height / 1e6 * spec.pickup_density))
+    kinds = list(PICKUP_KINDS) + rng.choices(PICKUP_KINDS, PICKUP_WEIGHTS, k=count - len(PICKUP_KINDS))
+    points = _free_points(count, bounds, placed, clearance, BOT_RADIUS * 2, rng)
+    return Arena(bounds, obstacles, spawns, list(zip(kinds, points)))
+
+
+def _random_polygon(box: pygame.Rect, vertices: int, rng: random.Random) -> list[pygame.Vector2]:
+    center = pygame.Vector2(box.center)
+    radius = min(box.width, box.height) / 2
+    step = math.tau / vertices
+    points = []
+    for i in range(vertices):
+        angle = (i + rng.uniform(0.15, 0.85)) * step
+        reach = radius * rng.uniform(0.5, 1.0)
+        points.append(center + pygame.Vector2(math.cos(angle), math.sin(angle)) * reach)
+    return points
+
+
+def _free_points(
+    count: int,
+    bounds: pygame.Rect,
+    placed: _BoxGrid,
+    clearance: float,
+    spacing: float,
+    rng: random.Random,
+) -> list[pygame.Vector2]:
+    inner = bounds.inflate(-clearance * 2, -clearance * 2)
+    taken = _BoxGrid(spacing * 2)
+    points = []
+    attempts = count * 50
+    while len(points) < count and attempts > 0:
+        attempts -= 1
+        x = round(rng.uniform(inner.left, inner.right))
+        y = round(rng.uniform(inner.top, inner.bottom))
+        probe = pygame.Rect(0, 0, clearance * 2, clearance * 2)
+        probe.center = (x, y)
+        if placed.collides(probe):
+            continue
+        near = pygame.Rect(0, 0, spacing * 2, spacing * 2)
+        near.center = (x, y)
+        if taken.collides(near):
+            continue
+        taken.add(pygame.Rect(x, y, 1, 1))
+        points.append(pygame.Vector2(x, y))
+    return points
+
+
+class _BoxGrid:
+    def __init__(self, cell_size: float):
+        self.cell_size = max(1, int(cell_size))
+        self.cells: dict[tuple[int, int], list[pygame.Rect]] = {}
+
+    def _cells(self, box: pygame.Rect) -> list[tuple[int, int]]:
+        size = self.cell_size
+        return [
+            (cx, cy)
+            for cx in range(box.left // size, (box.right - 1) // size + 1)
+            for cy in range(box.top // size, (box.bottom - 1) // size + 1)
+        ]
+
+    def add(self, box: pygame.Rect) -> None:
+        for cell in self._cells(box):
+            self.cells.setdefault(cell, []).append(box)
+
+    def collides(self, box: pygame.Rect) -> bool:
+        for cell in self._cells(box):
+            for other in self.cells.get(cell, ()):
+                if box.colliderect(other):
+                    return True
+        return False
@@ -0,0 +1,312 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pygame
+
+from src.game.entities import Bot
+
+if TYPE_CHECKING:
+    from src.nav.graph import NavGraph, NavNode
+
+FLOAT_COLUMNS = (
+    "x",
+    "y",
+    "spawn_x",
+    "spawn_y",
+    "aim_x",
+    "aim_y",
+    "desired_x",
+    "desired_y",
+    "radius",
+    "speed",
+    "reload_rail",
+    "reload_rocket",
+    "respawn_timer",
+)
+INT_COLUMNS = ("health", "ammo_rail", "ammo_rocket", "path_index")
+NEAREST_CELL_OCCUPANCY = 4.0
+DENSE_SCAN_LIMIT = 256
+
+
+def _scalar(name: str, kind: type) -> property:
+    def get(self: StoredBot):
+        return kind(getattr(self.store, name)[self.index])
+
+    def set(self: StoredBot, value) -> None:
+        getattr(self.store, name)[self.index] = value
+
+    return property(get, set)
+
+
+def _vector(x_name: str, y_name: str) -> property:
+    def get(self: StoredBot) -> pygame.Vector2:
+        store = self.store
+        return pygame.Vector2(
+            float(getattr(store, x_name)[self.index]), float(getattr(store, y_name)[self.index])
+        )
+
+    def set(self: StoredBot, value: pygame.Vector2) -> None:
+        store = self.store
+        getattr(store, x_name)[self.index] = value[0]
+        getattr(store, y_name)[self.index] = value[1]
+
+    return property(get, set)
+
+
+class StoredBot(Bot):
+    pos = _vector("x", "y")
+    spawn_pos = _vector("spawn_x", "spawn_y")
+    aim_dir = _vector("aim_x", "aim_y")
+    desired_dir = _vector("desired_x", "desired_y")
+    radius = _scalar("radius", float)
+    speed = _scalar("speed", float)
+    health = _scalar("health", int)
+    ammo_rail = _scalar("ammo_rail", int)
+    ammo_rocket = _scalar("ammo_rocket", int)
+    reload_rail = _scalar("reload_rail", float)
+    reload_rocket = _scalar("reload_rocket", float)
+    respawn_timer = _scalar("respawn_timer", float)
+    path_index = _scalar("path_index", int)
+
+    def __init__(self, store: BotStore, index: int, bot: Bot):
+        self.store = store
+        self.index = index
+        self.bot_id = bot.bot_id
+        self.color = bot.color
+        self.kills = bot.kills
+        self.deaths = bot.deaths
+        self.target_id = bot.target_id
+        self.state = bot.state
+        self.path = bot.path
+        self.goal = bot.goal
+        self.last_seen_enemy = bot.last_seen_enemy
+        self.last_pos = bot.last_pos
+        self.stuck_time = bot.stuck_time
+        self.route = bot.route
+
+
+class BotStore:
+    def __init__(self, capacity: int = 16):
+        self.count = 0
+        self.views: list[StoredBot] = []
+        for name in FLOAT_COLUMNS:
+            setattr(self, name, np.zeros(capacity, dtype=np.float64))
+        for name in INT_COLUMNS:
+            setattr(self, name, np.zeros(capacity, dtype=np.int64))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def add(self, bot: Bot) -> StoredBot:
+        if self.count == len(self.x):
+            self._grow(max(16, self.count * 2))
+        index = self.count
+        self.count += 1
+        view = StoredBot(self, index, bot)
+        view.pos = bot.pos
+        view.spawn_pos = bot.spawn_pos
+        view.aim_dir = bot.aim_dir
+        view.desired_dir = bot.desired_dir
+        for name in FLOAT_COLUMNS[8:] + INT_COLUMNS:
+            getattr(self, name)[index] = getattr(bot, name)
+        self.views.append(view)
+        return view
+
+    def _grow(self, capacity: int) -> None:
+        for name in FLOAT_COLUMNS + INT_COLUMNS:
+            column = getattr(self, name)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[: len(column)] = column
+            setattr(self, name, grown)
+
+    def tick_timers(self, dt: float) -> list[StoredBot]:
+        n = self.count
+        alive = self.health[:n] > 0
+        np.maximum(self.reload_rail[:n] - dt, 0.0, out=self.reload_rail[:n], where=alive)
+        np.maximum(self.reload_rocket[:n] - dt, 0.0, out=self.reload_rocket[:n], where=alive)
+        dead = ~alive
+        np.subtract(self.respawn_timer[:n], dt, out=self.respawn_timer[:n], where=dead)
+        due = np.flatnonzero(dead & (self.respawn_timer[:n] <= 0.0))
+        return [self.views[index] for index in due]
+
+    def nearest_nodes(self, nav: NavGraph) -> dict[int, NavNode | None]:
+        alive = np.flatnonzero(self.health[: self.count] > 0)
+        indices = nav.nearest_indices(self.x[alive], self.y[alive])
+        return {
+            self.views[index].bot_id: nav.node(node) if node >= 0 else None
+            for index, node in zip(alive.tolist(), indices.tolist())
+        }
+
+    def move_bots(self, dt: float) -> None:
+        movers = []
+        target_x = []
+        target_y = []
+        health = self.health
+        for view in self.views:
+            if health[view.index] <= 0:
+                continue
+            path = view.path
+            cursor = self.path_index[view.index]
+            if cursor >= len(path):
+                continue
+            target = path[cursor]
+            movers.append(view.index)
+            target_x.append(target.x)
+            target_y.append(target.y)
+        if not movers:
+            return
+
+        index = np.array(movers)
+        tx = np.array(target_x)
+        ty = np.array(target_y)
+        old_x = self.x[index]
+        old_y = self.y[index]
+        dx = tx - old_x
+        dy = ty - old_y
+        dist = np.hypot(dx, dy)
+        moving = dist > 1.0
+        safe = np.where(moving, dist, 1.0)
+        dir_x = dx / safe
+        dir_y = dy / safe
+        step = self.speed[index] * dt
+        reached = moving & (step >= dist)
+        new_x = np.where(reached, tx, old_x + dir_x * step)
+        new_y = np.where(reached, ty, old_y + dir_y * step)
+        new_x = np.where(moving, new_x, old_x)
+        new_y = np.where(moving, new_y, old_y)
+
+        moved = index[moving]
+        self.desired_x[moved] = dir_x[moving]
+        self.desired_y[moved] = dir_y[moving]
+        self.aim_x[moved] = dir_x[moving]
+        self.aim_y[moved] = dir_y[moving]
+        for position in np.flatnonzero(~moving | reached):
+            self.views[index[position]].advance_path()
+
+        blocked = self._overlaps(index[moving], new_x[moving], new_y[moving])
+        keep = moved[~blocked]
+        self.x[keep] = new_x[moving][~blocked]
+        self.y[keep] = new_y[moving][~blocked]
+
+    def _overlaps(self, index: np.ndarray, new_x: np.ndarray, new_y: np.ndarray) -> np.ndarray:
+        n = self.count
+        if len(index) == 0:
+            return np.zeros(0, dtype=bool)
+        alive = np.flatnonzero(self.health[:n] > 0)
+        proposed_x = self.x[:n].copy()
+        proposed_y = self.y[:n].copy()
+        proposed_x[index] = new_x
+        proposed_y[index] = new_y
+        if len(alive) <= DENSE_SCAN_LIMIT:
+            return self._overlaps_dense(index, new_x, new_y, alive, proposed_x, proposed_y)
+        owners = np.concatenate((alive, alive))
+        px = np.concatenate((self.x[alive], proposed_x[alive]))
+        py = np.concatenate((self.y[alive], proposed_y[alive]))
+        size = max(1.0, 2.0 * float(self.radius[alive].max()))
+        query, point = _cell_pairs(new_x, new_y, px, py, size)
+        owner = owners[point]
+        reach = self.radius[index[query]] + self.radius[owner]
+        hit = (new_x[query] - px[point]) ** 2 + (new_y[query] - py[point]) ** 2 < reach * reach
+        hit &= owner != index[query]
+        blocked = np.zeros(len(index), dtype=bool)
+        blocked[query[hit]] = True
+        return blocked
+
+    def _overlaps_dense(
+        self,
+        index: np.ndarray,
+        new_x: np.ndarray,
+        new_y: np.ndarray,
+        alive: np.ndarray,
+        proposed_x: np.ndarray,
+        proposed_y: np.ndarray,
+    ) -> np.ndarray:
+        reach = self.radius[index][:, None] + self.radius[alive][None, :]
+        reach *= reach
+        others = alive[None, :] != index[:, None]
+        hit = (new_x[:, None] - self.x[alive]) ** 2 + (new_y[:, None] - self.y[alive]) ** 2 < reach
+        hit |= (new_x[:, None] - proposed_x[alive]) ** 2 + (
+            new_y[:, None] - proposed_y[alive]
+        ) ** 2 < reach
+        return (hit & others).any(axis=1)
+
+    def closest_enemies(self) -> dict[int, StoredBot | None]:
+        n = self.count
+        alive = np.flatnonzero(self.health[:n] > 0)
+        enemies: dict[int, StoredBot | None] = {}
+        if len(alive) < 2:
+            for index in alive:
+                enemies[self.views[index].bot_id] = None
+            return enemies
+        x = self.x[alive]
+        y = self.y[alive]
+        count = len(alive)
+        if count <= DENSE_SCAN_LIMIT:
+            dist = (x[:, None] - x) ** 2 + (y[:, None] - y) ** 2
+            np.fill_diagonal(dist, np.inf)
+            best = dist.argmin(axis=1)
+        else:
+            best = _nearest_by_cell(x, y)
+        for index, other in zip(alive, alive[best]):
+            enemies[self.views[index].bot_id] = self.views[other]
+        return enemies
+
+
+def _nearest_by_cell(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    count = len(x)
+    area = (np.ptp(x) + 1.0) * (np.ptp(y) + 1.0)
+    size = max(1.0, float(np.sqrt(area * NEAREST_CELL_OCCUPANCY / count)))
+    query, point = _cell_pairs(x, y, x, y, size)
+    others = query != point
+    query = query[others]
+    point = point[others]
+    dist = (x[query] - x[point]) ** 2 + (y[query] - y[point]) ** 2
+    best_dist = np.full(count, np.inf)
+    np.minimum.at(best_dist, query, dist)
+    ties = dist == best_dist[query]
+    best = np.full(count, count, dtype=np.int64)
+    np.minimum.at(best, query[ties], point[ties])
+
+    far = np.flatnonzero(best_dist >= size * size)
+    if len(far):
+        dense = (x[far, None] - x) ** 2 + (y[far, None] - y) ** 2
+        dense[np.arange(len(far)), far] = np.inf
+        best[far] = dense.argmin(axis=1)
+    return best
+
+
+def _cell_pairs(
+    qx: np.ndarray, qy: np.ndarray, px: np.ndarray, py: np.ndarray, size: float
+) -> tuple[np.ndarray, np.ndarray]:
+    qcx = np.floor(qx / size).astype(np.int64)
+    qcy = np.floor(qy / size).astype(np.int64)
+    pcx = np.floor(px / size).astype(np.int64)
+    pcy = np.floor(py / size).astype(np.int64)
+    base_x = min(qcx.min(), pcx.min()) - 1
+    base_y = min(qcy.min(), pcy.min()) - 1
+    width = max(qcx.max(), pcx.max()) - base_x + 2
+    query_keys = (qcy - base_y) * width + (qcx - base_x)
+    point_keys = (pcy - base_y) * width + (pcx - base_x)
+    order = np.argsort(point_keys, kind="stable")
+    sorted_keys = point_keys[order]
+
+    queries = []
+    points = []
+    rows = np.arange(len(query_keys))
+    for dy in (-1, 0, 1):
+        for dx in (-1, 0, 1):
+            keys = query_keys + dy * width + dx
+            lo = np.searchsorted(sorted_keys, keys, side="left")
+            counts = np.searchsorted(sorted_keys, keys, side="right") - lo
+            total = int(counts.sum())
+            if total == 0:
+                continue
+            starts = np.cumsum(counts) - counts
+            queries.append(np.repeat(rows, counts))
+            points.append(order[np.arange(total) + np.repeat(lo - starts, counts)])
+    if not queries:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty
+    return np.concatenate(queries), np.concatenate(points)
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import random
+
 import pygame
 
 from src.core.config import (
+    BOT_RADIUS,
     RAIL_BEAM_TIME,
     RAIL_DAMAGE,
     RAIL_RELOAD,
@@ -14,7 +17,9 @@ from src.core.config import (
     ROCKET_SPREAD_DEG,
 )
 from src.game.entities import Bot, Explosion, RailShot, Rocket
-from src.core.geometry import line_intersects_polygon, point_in_polygon
+from src.core.geometry import ObstacleSet, point_in_polygon
+from src.game.spatial import SpatialHash
+from src.nav.visibility import VisibilityTable, line_of_sight
 
 
 def try_fire(
@@ -23,34 +28,38 @@ def try_fire(
     obstacles: list[list[pygame.Vector2]],
     rockets: list[Rocket],
     shots: list[RailShot],
+    visibility: VisibilityTable | None = None,
+    rng: random.Random | None = None,
 ) -> bool:
     if bot.health <= 0 or target.health <= 0:
         return False
-    if not has_line_of_sight(bot.pos, target.pos, obstacles):
+    if not line_of_sight(bot.pos, target.pos, obstacles, visibility):
         return False
 
     aim_vec = target.pos - bot.pos
     if aim_vec.length_squared() <= 0.0001:
         if bot.reload_rail > 0.0 or bot.ammo_rail <= 0:
             return False
-        return fire_rail(bot, target, shots)
+        return fire_rail(bot, target, shots, rng)
 
     bot.aim_dir = aim_vec.normalize()
     use_rocket = bot.ammo_rocket > 0 and bot.reload_rocket <= 0.0
 
     if use_rocket:
-        fire_rocket(bot, target, rockets)
+        fire_rocket(bot, target, rockets, rng)
         return False
     if bot.reload_rail > 0.0 or bot.ammo_rail <= 0:
         return False
-    return fire_rail(bot, target, shots)
+    return fire_rail(bot, target, shots, rng)
 
 
-def fire_rail(bot: Bot, target: Bot, shots: list[RailShot]) -> bool:
+def fire_rail(
+    bot: Bot, target: Bot, shots: list[RailShot], rng: random.Random | None = None
+) -> bool:
     bot.ammo_rail -= 1
     bot.reload_rail = RAIL_RELOAD
 
-    aim_dir = bot.aim_with_spread(RAIL_SPREAD_DEG)
+    aim_dir = bot.aim_with_spread(RAIL_SPREAD_DEG, rng)
     shot_vec = target.pos - bot.pos
     if shot_vec.length_squared() <= 0.0001:
         return False
@@ -64,10 +73,12 @@ def fire_rail(bot: Bot, target: Bot, shots: list[RailShot]) -> bool:
     return False
 
 
-def fire_rocket(bot: Bot, target: Bot, rockets: list[Rocket]) -> None:
+def fire_rocket(
+    bot: Bot, target: Bot, rockets: list[Rocket], rng: random.Random | None = None
+) -> None:
     bot.ammo_rocket -= 1
     bot.reload_rocket = ROCKET_RELOAD
-    aim_dir = bot.aim_with_spread(ROCKET_SPREAD_DEG)
+    aim_dir = bot.aim_with_spread(ROCKET_SPREAD_DEG, rng)
     rockets.append(
         Rocket(pos=bot.pos.copy(), vel=aim_dir * ROCKET_SPEED, owner_id=bot.bot_id)
     )
@@ -79,6 +90,7 @@ def update_rockets(
     obstacles: list[list[pygame.Vector2]],
     dt: float,
     explosions: list[Explosion],
+    bot_grid: SpatialHash | None = None,
 ) -> list[tuple[int, int]]:
     kills: list[tuple[int, int]] = []
     for rocket in rockets:
@@ -88,27 +100,35 @@ def update_rockets(
         rocket.pos += step
         rocket.traveled += step.length()
         if rocket.traveled >= rocket.max_distance:
-            kills.extend(explode(rocket, bots, explosions))
+            kills.extend(explode(rocket, bots, explosions, bot_grid))
             continue
         if hits_wall(rocket.pos, obstacles):
-            kills.extend(explode(rocket, bots, explosions))
+            kills.extend(explode(rocket, bots, explosions, bot_grid))
             continue
-        for bot in bots:
+        nearby = bots if bot_grid is None else bot_grid.query(rocket.pos, BOT_RADIUS)
+        for bot in nearby:
             if bot.health <= 0 or bot.bot_id == rocket.owner_id:
                 continue
             if (bot.pos - rocket.pos).length() <= bot.radius:
-                kills.extend(explode(rocket, bots, explosions))
+                kills.extend(explode(rocket, bots, explosions, bot_grid))
                 break
     return kills
 
 
-def explode(rocket: Rocket, bots: list[Bot], explosions: list[Explosion]) -> list[tuple[int, int]]:
+def explode(
+    rocket: Rocket,
+    bots: list[Bot],
+    explosions: list[Explosion],
+    bot_grid: SpatialHash | None = None,
+) -> list[tuple[int, int]]:
     if not rocket.alive:
         return []
     rocket.alive = False
     explosions.append(Explosion(rocket.pos.copy(), 0.25, ROCKET_BLAST_RADIUS))
     kills: list[tuple[int, int]] = []
 
+    if bot_grid is not None:
+        bots = bot_grid.query(rocket.pos, ROCKET_BLAST_RADIUS)
     for bot in bots:
         dist = (bot.pos - rocket.pos).length()
         if dist <= ROCKET_BLAST_RADIUS:
@@ -122,21 +142,14 @@ def explode(rocket: Rocket, bots: list[Bot], explosions: list[Explosion]) -> lis
 
 
 def hits_wall(pos: pygame.Vector2, obstacles: list[list[pygame.Vector2]]) -> bool:
+    if isinstance(obstacles, ObstacleSet):
+        return obstacles.point_blocked(pos)
     for poly in obstacles:
         if point_in_polygon(pos, poly):
             return True
     return False
 
 
-def has_line_of_sight(
-    start: pygame.Vector2, end: pygame.Vector2, obstacles: list[list[pygame.Vector2]]
-) -> bool:
-    for poly in obstacles:
-        if line_intersects_polygon(start, end, poly):
-            return False
-    return True
-
-
 def is_reloading(bot: Bot) -> bool:
     no_rail = bot.ammo_rail <= 0 or bot.reload_rail > 0.0
     no_rocket = bot.ammo_rocket <= 0 or bot.reload_rocket > 0.0
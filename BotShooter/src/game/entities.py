@@ -48,6 +48,7 @@ class Resource:
     pos: pygame.Vector2
     active: bool = True
     respawn_timer: float = 0.0
+    node_index: int | None = None
 
 
 @dataclass
@@ -83,10 +84,13 @@ class Bot:
     last_seen_enemy: pygame.Vector2 | None = None
     last_pos: pygame.Vector2 = field(default_factory=lambda: pygame.Vector2(0, 0))
     stuck_time: float = 0.0
+    route: list[int] = field(default_factory=list)
 
-    def draw(self, surface: pygame.Surface, highlight: bool = False) -> None:
+    def draw(
+        self, surface: pygame.Surface, highlight: bool = False, pos: pygame.Vector2 | None = None
+    ) -> None:
         color = COLOR_BOT_ENEMY if highlight else self.color
-        pygame.draw.circle(surface, color, self.pos, int(self.radius))
+        pygame.draw.circle(surface, color, self.pos if pos is None else pos, int(self.radius))
 
     def update_timers(self, dt: float) -> None:
         self.reload_rail = max(0.0, self.reload_rail - dt)
@@ -98,6 +102,7 @@ class Bot:
         self.path = []
         self.path_index = 0
         self.goal = None
+        self.route = []
 
     def move_towards(self, target: pygame.Vector2, dt: float) -> None:
         direction = target - self.pos
@@ -119,6 +124,7 @@ class Bot:
         self.path = nodes
         self.path_index = 0
         self.goal = nodes[-1] if nodes else None
+        self.route = []
 
     def path_target(self) -> pygame.Vector2 | None:
         if self.path_index >= len(self.path):
@@ -133,6 +139,8 @@ class Bot:
         else:
             self.path_index = len(self.path)
 
-    def aim_with_spread(self, degrees: float) -> pygame.Vector2:
-        jitter = random.uniform(-degrees, degrees)
+    def aim_with_spread(
+        self, degrees: float, rng: random.Random | None = None
+    ) -> pygame.Vector2:
+        jitter = (rng or random).uniform(-degrees, degrees)
         return rotate_vector(self.aim_dir, jitter).normalize()
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+
+import pygame
+
+from src.core.config import COLOR_BG, COLOR_WALL, TEXT_CACHE_SIZE
+
+
+class TextCache:
+    def __init__(self, capacity: int = TEXT_CACHE_SIZE):
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._surfaces: OrderedDict[tuple, pygame.Surface] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._surfaces)
+
+    def clear(self) -> None:
+        self._surfaces.clear()
+
+    def render(
+        self, font: pygame.font.Font, text: str, color: tuple[int, int, int]
+    ) -> pygame.Surface:
+        key = (font, text, color)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+        self.misses += 1
+        surface = font.render(text, True, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.capacity:
+            self._surfaces.popitem(last=False)
+        return surface
+
+
+class StaticLayer:
+    def __init__(self) -> None:
+        self.surface: pygame.Surface | None = None
+        self.key: tuple | None = None
+        self.builds = 0
+
+    def get(self, target: pygame.Surface, world, draw_nav: bool) -> pygame.Surface:
+        key = (
+            target.get_size(),
+            target.get_bitsize(),
+            id(world.obstacles),
+            world.obstacles.version,
+            id(world.nav),
+            world.nav.version,
+            tuple(world.bounds),
+            draw_nav,
+        )
+        if self.surface is None or key != self.key:
+            self.surface = self.render(target, world, draw_nav)
+            self.key = key
+            self.builds += 1
+        return self.surface
+
+    def invalidate(self) -> None:
+        self.key = None
+
+    def render(self, target: pygame.Surface, world, draw_nav: bool) -> pygame.Surface:
+        surface = pygame.Surface(target.get_size(), 0, target)
+        surface.fill(COLOR_BG)
+        pygame.draw.rect(surface, COLOR_WALL, world.bounds, 3)
+        for poly in world.obstacles:
+            pygame.draw.polygon(surface, (70, 85, 96), poly)
+        if draw_nav:
+            blocked = world.nav.blocked
+            for index, pos in enumerate(zip(world.nav.xs, world.nav.ys)):
+                if blocked is None or not blocked[index]:
+                    pygame.draw.circle(surface, (40, 50, 60), pos, 2)
+        return surface
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import json
+import struct
+import zlib
+from array import array
+from dataclasses import dataclass, field
+
+import pygame
+
+from src.core import config as game_config
+from src.core.config import HEADLESS_DT
+from src.game.world import World
+
+REPLAY_MAGIC = b"BSRP"
+REPLAY_VERSION = 1
+HEADER = struct.Struct("<4sHqdII")
+
+
+def config_snapshot() -> dict:
+    snapshot = {}
+    for name in dir(game_config):
+        if not name.isupper():
+            continue
+        value = getattr(game_config, name)
+        if isinstance(value, pygame.Rect):
+            value = [value.x, value.y, value.w, value.h]
+        elif isinstance(value, pygame.Vector2):
+            value = [value.x, value.y]
+        elif isinstance(value, tuple):
+            value = list(value)
+        elif not isinstance(value, (bool, int, float, str)):
+            continue
+        snapshot[name] = value
+    return snapshot
+
+
+def world_checksum(world: World) -> int:
+    crc = zlib.crc32(struct.pack("<d", world.time))
+    for bot in world.bots:
+        crc = zlib.crc32(
+            struct.pack(
+                "<iddiiiddiid",
+                bot.bot_id,
+                bot.pos.x,
+                bot.pos.y,
+                bot.health,
+                bot.ammo_rail,
+                bot.ammo_rocket,
+                bot.reload_rail,
+                bot.reload_rocket,
+                bot.kills,
+                bot.deaths,
+                bot.respawn_timer,
+            ),
+            crc,
+        )
+        crc = zlib.crc32(bot.state.encode(), crc)
+    for rocket in world.rockets:
+        crc = zlib.crc32(struct.pack("<ddi", rocket.pos.x, rocket.pos.y, rocket.owner_id), crc)
+    for resource in world.resources:
+        crc = zlib.crc32(struct.pack("<?d", resource.active, resource.respawn_timer), crc)
+    return crc
+
+
+@dataclass
+class Replay:
+    seed: int
+    dt: float
+    config: dict = field(default_factory=config_snapshot)
+    checksums: array = field(default_factory=lambda: array("I"))
+
+    def __len__(self) -> int:
+        return len(self.checksums)
+
+    def to_bytes(self) -> bytes:
+        blob = json.dumps(self.config, sort_keys=True, separators=(",", ":")).encode()
+        header = HEADER.pack(
+            REPLAY_MAGIC, REPLAY_VERSION, self.seed, self.dt, len(blob), len(self.checksums)
+        )
+        return header + zlib.compress(blob) + array("I", self.checksums).tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Replay:
+        magic, version, seed, dt, blob_size, ticks = HEADER.unpack_from(data)
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+            raise ValueError("not a BotShooter replay")
+        body = data[HEADER.size :]
+        decompressor = zlib.decompressobj()
+        blob = decompressor.decompress(body)
+        if len(blob) != blob_size:
+            raise ValueError("corrupt replay config block")
+        checksums = array("I")
+        checksums.frombytes(decompressor.unused_data[: 4 * ticks])
+        if len(checksums) != ticks:
+            raise ValueError("truncated replay")
+        return cls(seed, dt, json.loads(blob), checksums)
+
+    def save(self, path: str) -> None:
+        with open(path, "wb") as handle:
+            handle.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: str) -> Replay:
+        with open(path, "rb") as handle:
+            return cls.from_bytes(handle.read())
+
+
+def record_replay(seed: int, ticks: int, dt: float = HEADLESS_DT) -> Replay:
+    replay = Replay(seed, dt)
+    world = World(seed)
+    for _ in range(ticks):
+        if world.winner_id is not None:
+            break
+        world.update(dt)
+        replay.checksums.append(world_checksum(world))
+    world.close()
+    return replay
+
+
+def verify_replay(replay: Replay) -> int | None:
+    world = World(replay.seed)
+    try:
+        for tick, expected in enumerate(replay.checksums):
+            world.update(replay.dt)
+            if world_checksum(world) != expected:
+                return tick
+        return None
+    finally:
+        world.close()
+
+
+def config_differences(replay: Replay) -> list[str]:
+    current = config_snapshot()
+    names = sorted(set(current) | set(replay.config))
+    return [name for name in names if current.get(name) != replay.config.get(name)]
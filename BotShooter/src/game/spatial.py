@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import math
+from collections.abc import Callable, Iterable
+from typing import Any
+
+import pygame
+
+LINEAR_SCAN_LIMIT = 16
+
+
+class SpatialHash:
+    def __init__(self, cell_size: float):
+        self.cell_size = cell_size
+        self.cells: dict[tuple[int, int], list[Any]] = {}
+        self._entries: dict[int, tuple[tuple[int, int], int]] = {}
+        self._next_rank = 0
+        self._min_cell = (0, 0)
+        self._max_cell = (-1, -1)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def cell(self, pos: pygame.Vector2) -> tuple[int, int]:
+        return (math.floor(pos.x / self.cell_size), math.floor(pos.y / self.cell_size))
+
+    def clear(self) -> None:
+        self.cells.clear()
+        self._entries.clear()
+        self._next_rank = 0
+        self._min_cell = (0, 0)
+        self._max_cell = (-1, -1)
+
+    def rebuild(self, items: Iterable[Any]) -> None:
+        self.clear()
+        for item in items:
+            self.insert(item)
+
+    def insert(self, item: Any) -> None:
+        cell = self.cell(item.pos)
+        self._entries[id(item)] = (cell, self._next_rank)
+        self._next_rank += 1
+        self.cells.setdefault(cell, []).append(item)
+        self._grow(cell)
+
+    def remove(self, item: Any) -> None:
+        entry = self._entries.pop(id(item), None)
+        if entry is None:
+            return
+        bucket = self.cells[entry[0]]
+        bucket.remove(item)
+        if not bucket:
+            del self.cells[entry[0]]
+
+    def move(self, item: Any) -> None:
+        entry = self._entries.get(id(item))
+        if entry is None:
+            self.insert(item)
+            return
+        cell = self.cell(item.pos)
+        if cell == entry[0]:
+            return
+        bucket = self.cells[entry[0]]
+        bucket.remove(item)
+        if not bucket:
+            del self.cells[entry[0]]
+        self._entries[id(item)] = (cell, entry[1])
+        self.cells.setdefault(cell, []).append(item)
+        self._grow(cell)
+
+    def _grow(self, cell: tuple[int, int]) -> None:
+        if self._max_cell[0] < self._min_cell[0]:
+            self._min_cell = cell
+            self._max_cell = cell
+            return
+        self._min_cell = (min(self._min_cell[0], cell[0]), min(self._min_cell[1], cell[1]))
+        self._max_cell = (max(self._max_cell[0], cell[0]), max(self._max_cell[1], cell[1]))
+
+    def rank(self, item: Any) -> int:
+        return self._entries[id(item)][1]
+
+    def query(self, pos: pygame.Vector2, radius: float) -> list[Any]:
+        size = self.cell_size
+        x0 = math.floor((pos.x - radius) / size)
+        y0 = math.floor((pos.y - radius) / size)
+        x1 = math.floor((pos.x + radius) / size)
+        y1 = math.floor((pos.y + radius) / size)
+        cells = self.cells
+        found = []
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    found.extend(bucket)
+        if len(found) > 1:
+            entries = self._entries
+            found.sort(key=lambda item: entries[id(item)][1])
+        return found
+
+    def nearest(self, pos: pygame.Vector2, accept: Callable[[Any], bool]) -> Any | None:
+        if len(self._entries) <= LINEAR_SCAN_LIMIT:
+            return self._nearest_scan(pos, accept)
+        cx, cy = self.cell(pos)
+        min_x, min_y = self._min_cell
+        max_x, max_y = self._max_cell
+        max_ring = max(cx - min_x, max_x - cx, cy - min_y, max_y - cy, 0)
+        size = self.cell_size
+        entries = self._entries
+        cells = self.cells
+        best = None
+        best_key = None
+        scanned = 0
+        for ring in range(max_ring + 1):
+            if best_key is not None:
+                reach = (ring - 1) * size
+                if reach > 0 and best_key[0] < reach * reach:
+                    break
+            elif scanned > len(entries):
+                return self._nearest_scan(pos, accept)
+            ring_cells = _ring_cells(cx, cy, ring)
+            scanned += len(ring_cells)
+            for cell in ring_cells:
+                for item in cells.get(cell, ()):
+                    if not accept(item):
+                        continue
+                    key = ((item.pos - pos).length_squared(), entries[id(item)][1])
+                    if best_key is None or key < best_key:
+                        best = item
+                        best_key = key
+        return best
+
+    def _nearest_scan(self, pos: pygame.Vector2, accept: Callable[[Any], bool]) -> Any | None:
+        entries = self._entries
+        best = None
+        best_key = None
+        for bucket in self.cells.values():
+            for item in bucket:
+                if not accept(item):
+                    continue
+                key = ((item.pos - pos).length_squared(), entries[id(item)][1])
+                if best_key is None or key < best_key:
+                    best = item
+                    best_key = key
+        return best
+
+
+def _ring_cells(cx: int, cy: int, ring: int) -> list[tuple[int, int]]:
+    if ring == 0:
+        return [(cx, cy)]
+    cells = [(x, cy - ring) for x in range(cx - ring, cx + ring + 1)]
+    cells.extend((x, cy + ring) for x in range(cx - ring, cx + ring + 1))
+    cells.extend((cx - ring, y) for y in range(cy - ring + 1, cy + ring))
+    cells.extend((cx + ring, y) for y in range(cy - ring + 1, cy + ring))
+    return cells
@@ -1,61 +1,198 @@
 from __future__ import annotations
 
+import random
+
 import pygame
 
 from src.ai import behavior as ai
 from src.core.config import (
     AMMO_START_RAIL,
     AMMO_START_ROCKET,
+    BOT_ARRAY_STORE,
     BOT_MAX_HEALTH,
+    BOT_RADIUS,
     COLOR_ROCKET,
-    COLOR_WALL,
     MAP_BOUNDS,
+    NAV_ADAPTIVE_CHASE,
+    NAV_HEURISTIC,
+    NAV_HPA_CLUSTER_SIZE,
+    NAV_LANDMARKS,
+    NAV_PATH_BUDGET,
+    NAV_PATH_EXECUTOR,
+    NAV_PATH_SERVICE,
+    NAV_PATH_WORKERS,
+    NAV_PATH_CACHE_SIZE,
+    NAV_PLANNER,
+    NAV_STEP,
+    NAV_VISIBILITY,
+    NAV_VISIBILITY_WORKERS,
     PICKUP_RESPAWN,
+    PROFILE_ENABLED,
+    PROFILE_WINDOW,
     RAIL_BEAM_TIME,
+    SIM_SNAP_DISTANCE,
+    SPATIAL_CELL_SIZE,
 )
+from src.core.geometry import ObstacleSet
+from src.core.profiler import FrameProfiler
 from src.game import combat
+from src.game.arena import Arena
+from src.game.bot_store import BotStore
 from src.game.entities import Bot, Explosion, RailShot, Resource, Rocket
-from src.nav.graph import generate_nav_graph
+from src.game.render_cache import StaticLayer, TextCache
+from src.game.spatial import SpatialHash
+from src.nav.adaptive import AdaptivePlanner
+from src.nav.flow_field import FlowField
+from src.nav.graph import NavGraph, NavNode
+from src.nav.graph_cache import load_or_build_nav_graph
+from src.nav.hpa import HierarchicalGraph
+from src.nav.jps import JumpPointSearch
+from src.nav.landmarks import Landmarks
+from src.nav.path_cache import PathCache
+from src.nav.path_service import PathService
+from src.nav.visibility import VisibilityTable
 
 
 class World:
-    def __init__(self) -> None:
-        self.obstacles = build_obstacles()
-        self.nav = generate_nav_graph(self.obstacles)
-        self.bots = spawn_bots()
-        self.resources = build_resources(self.obstacles)
+    def __init__(
+        self, seed: int | None = None, bots: list[Bot] | None = None, arena: Arena | None = None
+    ) -> None:
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.arena = arena
+        if arena is None:
+            self.bounds = MAP_BOUNDS
+            self.obstacles = ObstacleSet(build_obstacles())
+            self.nav = load_or_build_nav_graph(self.obstacles)
+        else:
+            self.bounds = arena.bounds
+            self.obstacles = ObstacleSet(arena.obstacles)
+            self.nav = load_or_build_nav_graph(
+                self.obstacles, bounds=arena.bounds, seed=arena.nav_seed
+            )
+        self.landmarks: Landmarks | None = None
+        if NAV_HEURISTIC == "alt":
+            self.landmarks = Landmarks.build(self.nav, NAV_LANDMARKS)
+            self.nav.heuristic = self.landmarks.heuristic
+        if NAV_PLANNER == "hpa":
+            self.nav.hierarchy = HierarchicalGraph(self.nav, NAV_HPA_CLUSTER_SIZE)
+        elif NAV_PLANNER == "jps":
+            self.nav.jump_points = JumpPointSearch(self.nav)
+        self.nav.path_cache = PathCache(self.nav, NAV_PATH_CACHE_SIZE)
+        if NAV_ADAPTIVE_CHASE:
+            self.nav.adaptive = AdaptivePlanner(self.nav)
+        if NAV_PATH_SERVICE:
+            self.nav.path_service = PathService(
+                self.nav, NAV_PATH_WORKERS, NAV_PATH_EXECUTOR, NAV_PATH_BUDGET
+            )
+        self.visibility: VisibilityTable | None = None
+        if NAV_VISIBILITY:
+            self.visibility = VisibilityTable.build(
+                self.nav, self.obstacles, NAV_STEP, workers=NAV_VISIBILITY_WORKERS
+            )
+        if bots is None:
+            bots = spawn_bots() if arena is None else arena.spawn_bots()
+        self.bots = bots
+        self.bot_store: BotStore | None = None
+        if BOT_ARRAY_STORE:
+            self.bot_store = BotStore(len(self.bots))
+            self.bots = [self.bot_store.add(bot) for bot in self.bots]
+        self.bots_by_id = {bot.bot_id: bot for bot in self.bots}
+        self.bot_grid = SpatialHash(SPATIAL_CELL_SIZE)
+        self.bot_grid.rebuild(self.bots)
+        self.resources = build_resources(
+            self.obstacles, self.nav, None if arena is None else arena.pickups
+        )
+        self.flow_fields: dict[str, FlowField] = {}
+        for resource in self.resources:
+            if resource.kind not in self.flow_fields:
+                self.flow_fields[resource.kind] = FlowField(self.nav, resource.kind)
+        for field in self.flow_fields.values():
+            field.rebuild(self.resources)
         self.rail_shots: list[RailShot] = []
         self.rockets: list[Rocket] = []
         self.explosions: list[Explosion] = []
         self.time = 0.0
         self.winner_id: int | None = None
+        self.profiler = FrameProfiler(PROFILE_ENABLED, PROFILE_WINDOW)
+        self.static_layer = StaticLayer()
+        self.text_cache = TextCache()
+        self.previous_positions: dict[int, pygame.Vector2] = {}
 
     def update(self, dt: float) -> None:
         self.time += dt
         if self.winner_id is not None:
             return
 
-        for bot in self.bots:
-            if bot.health <= 0:
-                bot.respawn_timer -= dt
-                if bot.respawn_timer <= 0.0:
+        profiler = self.profiler
+        if profiler.enabled:
+            searches = self.nav.stats.searches
+            expanded = self.nav.stats.expanded
+            sight_tests = self.obstacles.segment_queries
+
+        if self.nav.path_service is not None:
+            with profiler.phase("paths"):
+                self.nav.path_service.deliver()
+        with profiler.phase("ai"):
+            self.bot_grid.rebuild(self.bots)
+            enemies = None
+            if self.bot_store is not None:
+                for bot in self.bot_store.tick_timers(dt):
                     respawn_bot(bot)
-                continue
-            bot.update_timers(dt)
-            ai.update_bot_ai(bot, self.bots, self.resources, dt, self.obstacles, self.nav)
-
-        for bot in self.bots:
-            if bot.health <= 0:
-                continue
-            target = bot.path_target()
-            if target is not None:
-                old_pos = bot.pos.copy()
-                bot.move_towards(target, dt)
-                if overlaps_any(bot, self.bots):
-                    bot.pos = old_pos
-
-            if bot.state in (ai.STATE_FIGHT, ai.STATE_FIGHT_FOR_LIFE) and bot.target_id is not None:
-                target_bot = next((b for b in self.bots if b.bot_id == bot.target_id), None)
+                    self.bot_grid.move(bot)
+                enemies = self.bot_store.closest_enemies()
+                nodes = self.bot_store.nearest_nodes(self.nav)
+            else:
+                nodes = bot_nodes(self.bots, self.nav)
+            for bot in self.bots:
+                if bot.health <= 0:
+                    if self.bot_store is None:
+                        bot.respawn_timer -= dt
+                        if bot.respawn_timer <= 0.0:
+                            respawn_bot(bot)
+                            self.bot_grid.move(bot)
+                    continue
+                if self.bot_store is None:
+                    bot.update_timers(dt)
+                ai.update_bot_ai(
+                    bot,
+                    self.bots,
+                    self.resources,
+                    dt,
+                    self.obstacles,
+                    self.nav,
+                    self.flow_fields,
+                    self.visibility,
+                    self.bot_grid,
+                    enemies,
+                    self.rng,
+                    nodes,
+                )
+
+        with profiler.phase("movement"):
+            if self.bot_store is not None:
+                self.bot_store.move_bots(dt)
+                self.bot_grid.rebuild(self.bots)
+            else:
+                for bot in self.bots:
+                    if bot.health <= 0:
+                        continue
+                    target = bot.path_target()
+                    if target is None:
+                        continue
+                    old_pos = bot.pos.copy()
+                    bot.move_towards(target, dt)
+                    if overlaps_any(bot, self.bot_grid.query(bot.pos, bot.radius + BOT_RADIUS)):
+                        bot.pos = old_pos
+                    self.bot_grid.move(bot)
+
+        with profiler.phase("firing"):
+            for bot in self.bots:
+                if bot.health <= 0 or bot.target_id is None:
+                    continue
+                if bot.state not in (ai.STATE_FIGHT, ai.STATE_FIGHT_FOR_LIFE):
+                    continue
+                target_bot = self.bots_by_id.get(bot.target_id)
                 if target_bot:
                     killed = combat.try_fire(
                         bot,
@@ -63,29 +200,46 @@ class World:
                         self.obstacles,
                         self.rockets,
                         self.rail_shots,
+                        self.visibility,
+                        self.rng,
                     )
                     if killed:
                         register_kill(self, bot.bot_id, target_bot.bot_id)
 
-        for shot in self.rail_shots:
-            shot.timer -= dt
-        self.rail_shots = [shot for shot in self.rail_shots if shot.timer > 0.0]
-        rocket_kills = combat.update_rockets(
-            self.rockets, self.bots, self.obstacles, dt, self.explosions
-        )
-        for killer_id, victim_id in rocket_kills:
-            register_kill(self, killer_id, victim_id)
-        self.rockets = [rocket for rocket in self.rockets if rocket.alive]
-        self.handle_resources(dt)
-        for explosion in self.explosions:
-            explosion.timer -= dt
-        self.explosions = [explosion for explosion in self.explosions if explosion.timer > 0.0]
-
-    def draw(self, surface: pygame.Surface, font: pygame.font.Font) -> None:
-        pygame.draw.rect(surface, COLOR_WALL, MAP_BOUNDS, 3)
-
-        for poly in self.obstacles:
-            pygame.draw.polygon(surface, (70, 85, 96), poly)
+        with profiler.phase("rail_shots"):
+            for shot in self.rail_shots:
+                shot.timer -= dt
+            self.rail_shots = [shot for shot in self.rail_shots if shot.timer > 0.0]
+        with profiler.phase("rockets"):
+            rocket_kills = combat.update_rockets(
+                self.rockets, self.bots, self.obstacles, dt, self.explosions, self.bot_grid
+            )
+            for killer_id, victim_id in rocket_kills:
+                register_kill(self, killer_id, victim_id)
+            self.rockets = [rocket for rocket in self.rockets if rocket.alive]
+        with profiler.phase("resources"):
+            self.handle_resources(dt)
+        with profiler.phase("explosions"):
+            for explosion in self.explosions:
+                explosion.timer -= dt
+            self.explosions = [explosion for explosion in self.explosions if explosion.timer > 0.0]
+
+        if profiler.enabled:
+            profiler.count("path_searches", self.nav.stats.searches - searches)
+            profiler.count("astar_expanded", self.nav.stats.expanded - expanded)
+            profiler.count("los_tests", self.obstacles.segment_queries - sight_tests)
+            profiler.count("rockets_alive", len(self.rockets))
+
+    def draw(
+        self,
+        surface: pygame.Surface,
+        font: pygame.font.Font,
+        *,
+        draw_nav: bool = False,
+        interpolation: float = 1.0,
+    ) -> None:
+        surface.blit(self.static_layer.get(surface, self, draw_nav), (0, 0))
+        text = self.text_cache
 
         for resource in self.resources:
             if not resource.active:
@@ -100,7 +254,7 @@ class World:
                 color = (200, 140, 120)
                 label_text = "Rocket"
             pygame.draw.circle(surface, color, resource.pos, 8)
-            label = font.render(label_text, True, (30, 30, 30))
+            label = text.render(font, label_text, (30, 30, 30))
             label_rect = label.get_rect(center=(resource.pos.x, resource.pos.y - 16))
             surface.blit(label, label_rect)
 
@@ -110,7 +264,7 @@ class World:
             pygame.draw.line(surface, color, shot.start, shot.end, 3)
 
         for rocket in self.rockets:
-            pygame.draw.circle(surface, COLOR_ROCKET, rocket.pos, 5)
+            pygame.draw.circle(surface, COLOR_ROCKET, self.interpolated(rocket, interpolation), 5)
 
         for explosion in self.explosions:
             alpha = max(0.0, min(1.0, explosion.timer / 0.25))
@@ -122,30 +276,48 @@ class World:
             pygame.draw.circle(surface, color, explosion.pos, radius, 2)
 
         for bot in self.bots:
-            bot.draw(surface, highlight=False)
+            pos = self.interpolated(bot, interpolation)
+            bot.draw(surface, highlight=False, pos=pos)
             if bot.health <= 0:
-                pygame.draw.circle(surface, (200, 80, 80), bot.pos, int(bot.radius))
+                pygame.draw.circle(surface, (200, 80, 80), pos, int(bot.radius))
                 timer = max(0.0, bot.respawn_timer)
-                timer_label = font.render(f"{timer:.1f}s", True, (220, 180, 180))
-                timer_rect = timer_label.get_rect(center=(bot.pos.x, bot.pos.y + bot.radius + 8))
+                timer_label = text.render(font, f"{timer:.1f}s", (220, 180, 180))
+                timer_rect = timer_label.get_rect(center=(pos.x, pos.y + bot.radius + 8))
                 surface.blit(timer_label, timer_rect)
             else:
-                label = font.render(str(bot.health), True, (220, 230, 240))
-                rect = label.get_rect(center=(bot.pos.x, bot.pos.y - bot.radius - 10))
+                label = text.render(font, str(bot.health), (220, 230, 240))
+                rect = label.get_rect(center=(pos.x, pos.y - bot.radius - 10))
                 surface.blit(label, rect)
-                stats = font.render(f"Bot {bot.bot_id}", True, (200, 210, 220))
-                stats_rect = stats.get_rect(center=(bot.pos.x, bot.pos.y + bot.radius + 8))
+                stats = text.render(font, f"Bot {bot.bot_id}", (200, 210, 220))
+                stats_rect = stats.get_rect(center=(pos.x, pos.y + bot.radius + 8))
                 surface.blit(stats, stats_rect)
                 if bot.reload_rail > 0.0 or bot.reload_rocket > 0.0:
-                    reload_label = font.render("reloading", True, (220, 200, 160))
-                    reload_rect = reload_label.get_rect(center=(bot.pos.x, bot.pos.y - bot.radius - 26))
+                    reload_label = text.render(font, "reloading", (220, 200, 160))
+                    reload_rect = reload_label.get_rect(center=(pos.x, pos.y - bot.radius - 26))
                     surface.blit(reload_label, reload_rect)
 
         if self.winner_id is not None:
-            label = font.render(f"Winner: Bot {self.winner_id}", True, (255, 220, 160))
+            label = text.render(font, f"Winner: Bot {self.winner_id}", (255, 220, 160))
             rect = label.get_rect(center=(surface.get_width() / 2, surface.get_height() - 16))
             surface.blit(label, rect)
 
+    def close(self) -> None:
+        if self.nav.path_service is not None:
+            self.nav.path_service.shutdown()
+
+    def remember_positions(self) -> None:
+        self.previous_positions = {id(bot): bot.pos.copy() for bot in self.bots}
+        for rocket in self.rockets:
+            self.previous_positions[id(rocket)] = rocket.pos.copy()
+
+    def interpolated(self, entity: Bot | Rocket, interpolation: float) -> pygame.Vector2:
+        if interpolation >= 1.0:
+            return entity.pos
+        previous = self.previous_positions.get(id(entity))
+        if previous is None or previous.distance_squared_to(entity.pos) > SIM_SNAP_DISTANCE**2:
+            return entity.pos
+        return previous.lerp(entity.pos, interpolation)
+
     def draw_debug(
         self,
         surface: pygame.Surface,
@@ -154,27 +326,125 @@ class World:
         draw_paths: bool = True,
     ) -> None:
         if draw_nav:
-            for node in self.nav.nodes:
-                pygame.draw.circle(surface, (40, 50, 60), node.pos, 2)
+            blocked = self.nav.blocked
+            for index, pos in enumerate(zip(self.nav.xs, self.nav.ys)):
+                if blocked is None or not blocked[index]:
+                    pygame.draw.circle(surface, (40, 50, 60), pos, 2)
         if draw_paths:
             for bot in self.bots:
                 if bot.path and len(bot.path) > 1:
                     pygame.draw.lines(surface, (120, 180, 200), False, bot.path, 2)
 
+    def add_obstacle(self, polygon: list[pygame.Vector2]) -> list[pygame.Vector2]:
+        self._check_repairable()
+        polygon = [pygame.Vector2(point) for point in polygon]
+        self.obstacles.append(polygon)
+        self.obstacles.rebuild()
+        self.repair_nav(polygon_rect(polygon))
+        return polygon
+
+    def remove_obstacle(self, polygon: list[pygame.Vector2]) -> None:
+        self._check_repairable()
+        del self.obstacles[self._obstacle_index(polygon)]
+        self.obstacles.rebuild()
+        self.repair_nav(polygon_rect(polygon))
+
+    def move_obstacle(
+        self, polygon: list[pygame.Vector2], offset: pygame.Vector2
+    ) -> list[pygame.Vector2]:
+        self._check_repairable()
+        index = self._obstacle_index(polygon)
+        moved = [point + offset for point in polygon]
+        self.obstacles[index] = moved
+        self.obstacles.rebuild()
+        self.repair_nav(polygon_rect(polygon), polygon_rect(moved))
+        return moved
+
+    def _check_repairable(self) -> None:
+        if self.nav.lattice is None:
+            raise ValueError("nav graph was not built as a lattice; set NAV_BUILDER = 'lattice'")
+
+    def _obstacle_index(self, polygon: list[pygame.Vector2]) -> int:
+        for index, poly in enumerate(self.obstacles):
+            if poly is polygon:
+                return index
+        raise ValueError("polygon is not one of this world's obstacles")
+
+    def repair_nav(self, *areas: pygame.Rect) -> list[int]:
+        changed: list[int] = []
+        for area in areas:
+            changed.extend(self.nav.repair(self.obstacles, area))
+        if self.visibility is not None:
+            for area in areas:
+                self.visibility.invalidate(area)
+        margin = BOT_RADIUS + self.nav.step
+        regions = [area.inflate(margin * 2, margin * 2) for area in areas]
+        for resource in self.resources:
+            if (
+                resource.active
+                and any(region.collidepoint(resource.pos) for region in regions)
+                and resource_blocked(resource.pos, self.obstacles)
+            ):
+                resource.active = False
+                resource.respawn_timer = 0.0
+                self.flow_fields[resource.kind].remove(resource, self.resources)
+        if not changed:
+            return changed
+        if self.landmarks is not None:
+            self.landmarks.repair(changed)
+        if self.nav.hierarchy is not None:
+            self.nav.hierarchy.repair(changed)
+        if self.nav.jump_points is not None:
+            self.nav.jump_points.sync(changed)
+
+        blocked = self.nav.blocked
+        moved = []
+        for resource in self.resources:
+            if resource.node_index is None or blocked[resource.node_index]:
+                node = self.nav.nearest_node(resource.pos)
+                resource.node_index = node.index if node else None
+                moved.append(resource)
+        for field in self.flow_fields.values():
+            field.invalidate(changed, self.resources)
+        for resource in moved:
+            if resource.kind in self.flow_fields:
+                self.flow_fields[resource.kind].add(resource)
+
+        for bot in self.bots:
+            if bot.health <= 0 or bot.path_target() is None:
+                continue
+            points = [bot.pos, *bot.path[bot.path_index :]]
+            if not bot.route and not any(
+                region.clipline(a, b) for a, b in zip(points, points[1:]) for region in regions
+            ):
+                continue
+            goal = bot.goal if bot.goal is not None else bot.path[-1]
+            if self.obstacles.circle_blocked(goal, bot.radius):
+                node = self.nav.nearest_node(goal)
+                goal = node.pos if node else goal
+            ai.cancel_path_request(bot, self.nav)
+            bot.set_path([])
+            ai.assign_path(bot, self.nav, goal, self.obstacles)
+        return changed
+
     def handle_resources(self, dt: float) -> None:
         for resource in self.resources:
             if not resource.active:
                 resource.respawn_timer -= dt
-                if resource.respawn_timer <= 0.0:
+                if resource.respawn_timer <= 0.0 and not resource_blocked(
+                    resource.pos, self.obstacles
+                ):
                     resource.active = True
+                    self.flow_fields[resource.kind].add(resource)
                 continue
-            for bot in self.bots:
+            for bot in self.bot_grid.query(resource.pos, BOT_RADIUS + 8):
                 if bot.health <= 0:
                     continue
                 if (bot.pos - resource.pos).length() <= bot.radius + 8:
                     apply_resource(bot, resource)
                     resource.active = False
                     resource.respawn_timer = PICKUP_RESPAWN
+                    self.flow_fields[resource.kind].remove(resource, self.resources)
                     break
 
 
@@ -232,7 +502,27 @@ def spawn_bots() -> list[Bot]:
     return bots
 
 
-def build_resources(obstacles) -> list[Resource]:
+def bot_nodes(bots: list[Bot], nav: NavGraph) -> dict[int, NavNode | None]:
+    alive = [bot for bot in bots if bot.health > 0]
+    return dict(zip((bot.bot_id for bot in alive), nav.nearest_nodes([bot.pos for bot in alive])))
+
+
+def build_resources(
+    obstacles, nav: NavGraph | None = None, pickups: list[tuple[str, pygame.Vector2]] | None = None
+) -> list[Resource]:
+    if pickups is None:
+        pickups = default_pickups()
+    resources: list[Resource] = []
+    for kind, pos in pickups:
+        if not resource_blocked(pos, obstacles):
+            resources.append(Resource(kind, pos.copy()))
+    if nav is not None:
+        for resource, node in zip(resources, nav.nearest_nodes([r.pos for r in resources])):
+            resource.node_index = node.index if node else None
+    return resources
+
+
+def default_pickups() -> list[tuple[str, pygame.Vector2]]:
     spawn_points = [
         pygame.Vector2(120, 300),
         pygame.Vector2(780, 320),
@@ -248,11 +538,7 @@ def build_resources(obstacles) -> list[Resource]:
         pygame.Vector2(520, 380),
     ]
     kinds = ["health"] * 3 + ["rail_ammo"] * 5 + ["rocket_ammo"] * 4
-    resources: list[Resource] = []
-    for kind, pos in zip(kinds, spawn_points, strict=False):
-        if not resource_blocked(pos, obstacles):
-            resources.append(Resource(kind, pos))
-    return resources
+    return list(zip(kinds, spawn_points, strict=False))
 
 
 def apply_resource(bot: Bot, resource: Resource) -> None:
@@ -275,8 +561,8 @@ def respawn_bot(bot: Bot) -> None:
 
 
 def register_kill(world: World, killer_id: int, victim_id: int) -> None:
-    killer = next((b for b in world.bots if b.bot_id == killer_id), None)
-    victim = next((b for b in world.bots if b.bot_id == victim_id), None)
+    killer = world.bots_by_id.get(killer_id)
+    victim = world.bots_by_id.get(victim_id)
     if not killer or not victim:
         return
     if victim.health > 0:
@@ -284,13 +570,27 @@ def register_kill(world: World, killer_id: int, victim_id: int) -> None:
     killer.kills += 1
     victim.deaths += 1
     victim.down(5.0)
+    if world.nav.path_service is not None:
+        world.nav.path_service.cancel(victim.bot_id)
+    if world.nav.adaptive is not None:
+        world.nav.adaptive.forget(victim.bot_id)
     if killer.kills >= 5:
         world.winner_id = killer.bot_id
 
 
+def polygon_rect(polygon: list[pygame.Vector2]) -> pygame.Rect:
+    left = min(point.x for point in polygon)
+    top = min(point.y for point in polygon)
+    right = max(point.x for point in polygon)
+    bottom = max(point.y for point in polygon)
+    return pygame.Rect(left, top, right - left + 1, bottom - top + 1)
+
+
 def resource_blocked(pos: pygame.Vector2, obstacles: list[list[pygame.Vector2]]) -> bool:
     from src.core.geometry import circle_intersects_polygon
 
+    if isinstance(obstacles, ObstacleSet):
+        return obstacles.circle_blocked(pos, 8)
     for poly in obstacles:
         if circle_intersects_polygon(pos, 8, poly):
             return True
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import math
+
+from src.core.config import NAV_ADAPTIVE_MEMORY
+from src.nav.astar import SearchState, astar_indices
+from src.nav.graph import NavGraph, NavNode
+
+
+class AdaptiveSearch:
+    def __init__(self, graph: NavGraph, memory: int = NAV_ADAPTIVE_MEMORY):
+        self.graph = graph
+        self.memory = memory
+        self.version = graph.version
+        self.goal = -1
+        self.offset = 0.0
+        self.learned: dict[int, float] = {}
+
+    def estimate(self, node: int, goal: int) -> float:
+        graph = self.graph
+        if graph.heuristic is None:
+            bound = graph.distance(node, goal)
+        else:
+            bound = graph.heuristic(node, goal)
+        learned = self.learned.get(node)
+        if learned is not None and learned - self.offset > bound:
+            return learned - self.offset
+        return bound
+
+    def retarget(self, goal: int) -> None:
+        if self.version != self.graph.version or len(self.learned) > self.memory:
+            self.learned.clear()
+            self.offset = 0.0
+            self.version = self.graph.version
+        elif self.goal >= 0 and goal != self.goal:
+            self.offset += self.estimate(goal, self.goal)
+        self.goal = goal
+
+    def find_path(self, start: int, goal: int, state: SearchState) -> list[int]:
+        self.retarget(goal)
+        closed: list[int] = []
+        path = astar_indices(
+            self.graph,
+            start,
+            goal,
+            state=state,
+            closed_nodes=closed,
+            learned=self.learned,
+            offset=self.offset,
+        )
+        if len(path) > 1:
+            g_score = state.g
+            bias = g_score[goal] + self.offset
+            learned = self.learned
+            for node in closed:
+                learned[node] = bias - g_score[node]
+        return path
+
+
+class AdaptivePlanner:
+    def __init__(self, graph: NavGraph, memory: int = NAV_ADAPTIVE_MEMORY):
+        self.graph = graph
+        self.memory = memory
+        self.state = SearchState(len(graph))
+        self.searches: dict[int, AdaptiveSearch] = {}
+
+    def find_path(self, agent_id: int, start: NavNode, goal: NavNode) -> list[NavNode]:
+        search = self.searches.get(agent_id)
+        if search is None:
+            search = self.searches[agent_id] = AdaptiveSearch(self.graph, self.memory)
+        if self.state.size != len(self.graph):
+            self.state = SearchState(len(self.graph))
+        indices = search.find_path(start.index, goal.index, self.state)
+        return [self.graph.node(index) for index in indices]
+
+    def forget(self, agent_id: int) -> None:
+        self.searches.pop(agent_id, None)
@@ -1,66 +1,172 @@
 from __future__ import annotations
 
 import heapq
+import math
+from array import array
+from collections.abc import Callable
 
 from src.nav.graph import NavGraph, NavNode
 
 
-def astar(graph: NavGraph, start: NavNode, goal: NavNode) -> list[NavNode]:
-    if start.index == goal.index:
+class SearchState:
+    def __init__(self, size: int):
+        self.size = size
+        self.g = array("d", bytes(8 * size))
+        self.parent = array("i", bytes(4 * size))
+        self.opened = array("I", bytes(4 * size))
+        self.closed = array("I", bytes(4 * size))
+        self.generation = 0
+
+    def next_generation(self) -> int:
+        self.generation += 1
+        if self.generation >= 0xFFFFFFFF:
+            self.opened = array("I", bytes(4 * self.size))
+            self.closed = array("I", bytes(4 * self.size))
+            self.generation = 1
+        return self.generation
+
+
+def graph_search_state(graph: NavGraph) -> SearchState:
+    state = graph.search_state
+    if state is None or state.size != len(graph):
+        state = SearchState(len(graph))
+        graph.search_state = state
+    return state
+
+
+def astar(
+    graph: NavGraph,
+    start: NavNode,
+    goal: NavNode,
+    heuristic: Callable[[int, int], float] | None = None,
+    state: SearchState | None = None,
+) -> list[NavNode]:
+    indices = astar_indices(graph, start.index, goal.index, heuristic, state)
+    return [graph.node(index) for index in indices]
+
+
+def astar_indices(
+    graph: NavGraph,
+    start: int,
+    goal: int,
+    heuristic: Callable[[int, int], float] | None = None,
+    state: SearchState | None = None,
+    closed_nodes: list[int] | None = None,
+    learned: dict[int, float] | None = None,
+    offset: float = 0.0,
+) -> list[int]:
+    stats = graph.stats
+    stats.searches += 1
+    if start == goal:
         return [start]
 
-    open_set: list[tuple[float, int]] = []
-    heapq.heappush(open_set, (0.0, start.index))
-
-    came_from: dict[int, int] = {}
-
-    g_score: dict[int, float] = {start.index: 0.0}
-    f_score: dict[int, float] = {
-        start.index: (start.pos - goal.pos).length()
-    }
-
-    in_open = {start.index}
+    if heuristic is None:
+        heuristic = graph.heuristic
+    if state is None:
+        state = graph_search_state(graph)
+    generation = state.next_generation()
+    g_score = state.g
+    parent = state.parent
+    opened = state.opened
+    closed = state.closed
+
+    xs = graph.xs
+    ys = graph.ys
+    offsets = graph.offsets
+    targets = graph.targets
+    costs = graph.costs
+    goal_x = xs[goal]
+    goal_y = ys[goal]
+    hypot = math.hypot
+    push = heapq.heappush
+    pop = heapq.heappop
+
+    g_score[start] = 0.0
+    parent[start] = -1
+    opened[start] = generation
+    if heuristic is None:
+        start_h = hypot(xs[start] - goal_x, ys[start] - goal_y)
+    else:
+        start_h = heuristic(start, goal)
+    if learned is not None:
+        value = learned.get(start)
+        if value is not None and value - offset > start_h:
+            start_h = value - offset
+    open_set: list[tuple[float, int]] = [(start_h, start)]
+    expanded = 0
 
     while open_set:
-        _, current_index = heapq.heappop(open_set)
-        in_open.discard(current_index)
-
-        if current_index == goal.index:
-            return reconstruct_path(graph, came_from, current_index)
-
-        current_node = graph.nodes[current_index]
-
-        for neighbor_index in graph.edges.get(current_index, []):
-            neighbor_node = graph.nodes[neighbor_index]
-
-            tentative = g_score[current_index] + (
-                neighbor_node.pos - current_node.pos
-            ).length()
-
-            if tentative < g_score.get(neighbor_index, float("inf")):
-                came_from[neighbor_index] = current_index
-                g_score[neighbor_index] = tentative
-
-                f_score[neighbor_index] = tentative + (
-                    neighbor_node.pos - goal.pos
-                ).length()
+        _, current = pop(open_set)
+        if closed[current] == generation:
+            continue
+        closed[current] = generation
+        expanded += 1
+        if closed_nodes is not None:
+            closed_nodes.append(current)
+
+        if current == goal:
+            stats.expanded += expanded
+            return reconstruct_path(parent, current)
+
+        current_g = g_score[current]
+        for k in range(offsets[current], offsets[current + 1]):
+            neighbor = targets[k]
+            if closed[neighbor] == generation:
+                continue
+            tentative = current_g + costs[k]
+            if opened[neighbor] == generation and tentative >= g_score[neighbor]:
+                continue
+            opened[neighbor] = generation
+            g_score[neighbor] = tentative
+            parent[neighbor] = current
+            if heuristic is None:
+                h = hypot(xs[neighbor] - goal_x, ys[neighbor] - goal_y)
+            else:
+                h = heuristic(neighbor, goal)
+            if learned is not None:
+                value = learned.get(neighbor)
+                if value is not None and value - offset > h:
+                    h = value - offset
+            push(open_set, (tentative + h, neighbor))
+
+    stats.expanded += expanded
+    return []
 
-                if neighbor_index not in in_open:
-                    heapq.heappush(
-                        open_set,
-                        (f_score[neighbor_index], neighbor_index),
-                    )
-                    in_open.add(neighbor_index)
 
-    return []
+def find_path(graph: NavGraph, start: NavNode, goal: NavNode) -> list[NavNode]:
+    if graph.path_cache is None:
+        return plan_path(graph, start, goal)
+    return graph.path_cache.get_or_compute(start, goal, plan_path)
 
 
-def reconstruct_path(
-    graph: NavGraph, came_from: dict[int, int], current_index: int
+def plan_path(
+    graph: NavGraph, start: NavNode, goal: NavNode, state: SearchState | None = None
 ) -> list[NavNode]:
-    path = [graph.nodes[current_index]]
-    while current_index in came_from:
-        current_index = came_from[current_index]
-        path.append(graph.nodes[current_index])
+    return [graph.node(index) for index in plan_indices(graph, start.index, goal.index, state)]
+
+
+def plan_indices(
+    graph: NavGraph, start: int, goal: int, state: SearchState | None = None
+) -> list[int]:
+    hierarchy = graph.hierarchy
+    if (
+        hierarchy is not None
+        and hierarchy.version == graph.version
+        and graph.distance(start, goal) > hierarchy.cluster_size * graph.step
+    ):
+        indices = hierarchy.find_path(start, goal)
+        if indices:
+            return indices
+    jump_points = graph.jump_points
+    if jump_points is not None and jump_points.version == graph.version:
+        return jump_points.find_path(start, goal)
+    return astar_indices(graph, start, goal, state=state)
+
+
+def reconstruct_path(parent: array, current: int) -> list[int]:
+    path = [current]
+    while parent[current] >= 0:
+        current = parent[current]
+        path.append(current)
     path.reverse()
     return path
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import heapq
+from collections.abc import Iterable
+
+from src.game.entities import Resource
+from src.nav.graph import NavGraph, NavNode
+
+
+class FlowField:
+    def __init__(self, graph: NavGraph, kind: str):
+        self.graph = graph
+        self.kind = kind
+        count = len(graph)
+        self.dist: list[float] = [float("inf")] * count
+        self.hops: list[int] = [0] * count
+        self.next_hop: list[int] = [-1] * count
+        self.target: list[Resource | None] = [None] * count
+
+    def rebuild(self, resources: list[Resource]) -> None:
+        count = len(self.graph)
+        self.dist = [float("inf")] * count
+        self.hops = [0] * count
+        self.next_hop = [-1] * count
+        self.target = [None] * count
+        self._spread(self._seeds(resources))
+
+    def add(self, resource: Resource) -> None:
+        self._spread(self._seeds([resource]))
+
+    def remove(self, resource: Resource, resources: list[Resource]) -> None:
+        index = resource.node_index
+        if index is not None and self.target[index] is resource:
+            self.invalidate([index], resources)
+
+    def invalidate(self, roots: Iterable[int], resources: list[Resource]) -> None:
+        graph = self.graph
+        offsets = graph.offsets
+        links = graph.targets if graph.lattice is None else graph.lattice.targets
+        dist = self.dist
+        hops = self.hops
+        next_hop = self.next_hop
+        target = self.target
+
+        region = set(roots)
+        stack = list(region)
+        while stack:
+            current = stack.pop()
+            for k in range(offsets[current], offsets[current + 1]):
+                neighbor = links[k]
+                if next_hop[neighbor] == current and neighbor not in region:
+                    region.add(neighbor)
+                    stack.append(neighbor)
+
+        inf = float("inf")
+        for index in region:
+            dist[index] = inf
+            hops[index] = 0
+            next_hop[index] = -1
+            target[index] = None
+
+        heap = []
+        targets = graph.targets
+        for index in region:
+            for k in range(offsets[index], offsets[index + 1]):
+                neighbor = targets[k]
+                if dist[neighbor] < inf:
+                    heap.append((dist[neighbor], neighbor))
+        inside = [resource for resource in resources if resource.node_index in region]
+        heap.extend(self._seeds(inside))
+        heapq.heapify(heap)
+        self._spread(heap)
+
+    def _seeds(self, resources: Iterable[Resource]) -> list[tuple[float, int]]:
+        dist = self.dist
+        heap: list[tuple[float, int]] = []
+        for resource in resources:
+            if not resource.active or resource.kind != self.kind or resource.node_index is None:
+                continue
+            index = resource.node_index
+            if dist[index] > 0.0:
+                dist[index] = 0.0
+                self.hops[index] = 0
+                self.next_hop[index] = -1
+                self.target[index] = resource
+                heap.append((0.0, index))
+        return heap
+
+    def _spread(self, heap: list[tuple[float, int]]) -> None:
+        graph = self.graph
+        offsets = graph.offsets
+        targets = graph.targets
+        costs = graph.costs
+        dist = self.dist
+        hops = self.hops
+        next_hop = self.next_hop
+        target = self.target
+        while heap:
+            current_dist, current = heapq.heappop(heap)
+            if current_dist > dist[current]:
+                continue
+            for k in range(offsets[current], offsets[current + 1]):
+                neighbor = targets[k]
+                candidate = current_dist + costs[k]
+                if candidate < dist[neighbor]:
+                    dist[neighbor] = candidate
+                    hops[neighbor] = hops[current] + 1
+                    next_hop[neighbor] = current
+                    target[neighbor] = target[current]
+                    heapq.heappush(heap, (candidate, neighbor))
+
+    def nearest(self, node: NavNode, max_hops: int | None = None) -> Resource | None:
+        if max_hops is not None and self.hops[node.index] > max_hops:
+            return None
+        return self.target[node.index]
+
+    def next_waypoint(self, node: NavNode) -> NavNode | None:
+        index = self.next_hop[node.index]
+        if index < 0:
+            return None
+        return self.graph.node(index)
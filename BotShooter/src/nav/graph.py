@@ -1,12 +1,28 @@
 from __future__ import annotations
 
+import math
+from array import array
 from collections import deque
+from collections.abc import Callable, Mapping, Sequence
 from dataclasses import dataclass
+from typing import TYPE_CHECKING
 
+import numpy as np
 import pygame
 
-from src.core.config import BOT_RADIUS, MAP_BOUNDS, NAV_SEED, NAV_STEP
-from src.core.geometry import circle_intersects_polygon
+from src.core.config import BOT_RADIUS, EPS, MAP_BOUNDS, NAV_BUILDER, NAV_SEED, NAV_STEP
+from src.core.geometry import ObstacleSet
+
+if TYPE_CHECKING:
+    from src.nav.adaptive import AdaptivePlanner
+    from src.nav.hpa import HierarchicalGraph
+    from src.nav.jps import JumpPointSearch
+    from src.nav.path_cache import PathCache
+    from src.nav.path_service import PathService
+
+NAV_DIRECTIONS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1))
+NEAREST_BATCH_RINGS = 2
+NEAREST_BATCH_MIN = 128
 
 
 @dataclass(frozen=True)
@@ -15,46 +31,422 @@ class NavNode:
     pos: pygame.Vector2
 
 
+@dataclass
+class Lattice:
+    columns: np.ndarray
+    rows: np.ndarray
+    bounds: pygame.Rect
+    targets: array
+
+
+@dataclass
+class SearchStats:
+    searches: int = 0
+    expanded: int = 0
+
+    def reset(self) -> None:
+        self.searches = 0
+        self.expanded = 0
+
+
 class NavGraph:
-    def __init__(self, nodes: list[NavNode], edges: dict[int, list[int]]):
-        self.nodes = nodes
-        self.edges = edges
+    def __init__(
+        self,
+        nodes: list[NavNode],
+        edges: dict[int, list[int]],
+        origin: pygame.Vector2 = NAV_SEED,
+        step: float = NAV_STEP,
+    ):
+        xs = array("f", (node.pos.x for node in nodes))
+        ys = array("f", (node.pos.y for node in nodes))
+        offsets = array("i", [0])
+        targets = array("i")
+        for index in range(len(nodes)):
+            targets.extend(edges.get(index, []))
+            offsets.append(len(targets))
+        self._init_arrays(xs, ys, offsets, targets, origin, step)
 
-    def nearest_node(self, pos: pygame.Vector2) -> NavNode | None:
-        best = None
+    @classmethod
+    def from_arrays(
+        cls,
+        xs: array,
+        ys: array,
+        offsets: array,
+        targets: array,
+        origin: pygame.Vector2 = NAV_SEED,
+        step: float = NAV_STEP,
+    ) -> NavGraph:
+        graph = cls.__new__(cls)
+        graph._init_arrays(xs, ys, offsets, targets, origin, step)
+        return graph
+
+    def _init_arrays(
+        self,
+        xs: array,
+        ys: array,
+        offsets: array,
+        targets: array,
+        origin: pygame.Vector2,
+        step: float,
+    ) -> None:
+        self.xs = xs
+        self.ys = ys
+        self.offsets = offsets
+        self.targets = targets
+        x = np.frombuffer(xs, dtype=np.float32).astype(np.float64)
+        y = np.frombuffer(ys, dtype=np.float32).astype(np.float64)
+        ends = np.frombuffer(targets, dtype=np.int32)
+        starts = np.repeat(np.arange(len(x)), np.diff(np.frombuffer(offsets, dtype=np.int32)))
+        costs = np.hypot(x[ends] - x[starts], y[ends] - y[starts])
+        self.costs = array("f", costs.astype(np.float32).tobytes())
+        self.nodes = NodeView(self)
+        self.edges = EdgeView(self)
+        self.origin = pygame.Vector2(origin)
+        self.step = float(step)
+        self.heuristic: Callable[[int, int], float] | None = None
+        self.stats = SearchStats()
+        self.path_cache: PathCache | None = None
+        self.path_service: PathService | None = None
+        self.hierarchy: HierarchicalGraph | None = None
+        self.jump_points: JumpPointSearch | None = None
+        self.adaptive: AdaptivePlanner | None = None
+        self.search_state = None
+        self.version = 0
+        self.blocked: bytearray | None = None
+        self.lattice: Lattice | None = None
+        self._components: tuple[int, np.ndarray, dict[int, np.ndarray]] | None = None
+        self._build_index()
+
+    def __len__(self) -> int:
+        return len(self.xs)
+
+    def node(self, index: int) -> NavNode:
+        return NavNode(index, pygame.Vector2(self.xs[index], self.ys[index]))
+
+    def distance(self, a: int, b: int) -> float:
+        return math.hypot(self.xs[a] - self.xs[b], self.ys[a] - self.ys[b])
+
+    def cell(self, x: float, y: float) -> tuple[int, int]:
+        return (
+            math.floor((x - self.origin.x) / self.step + 0.5),
+            math.floor((y - self.origin.y) / self.step + 0.5),
+        )
+
+    def _build_index(self) -> None:
+        if not len(self.xs):
+            self._cell_min = (0, 0)
+            self._cell_max = (-1, -1)
+            self._heads = array("i")
+            self._chain = array("i")
+            return
+        x = np.frombuffer(self.xs, dtype=np.float32).astype(np.float64)
+        y = np.frombuffer(self.ys, dtype=np.float32).astype(np.float64)
+        cx = np.floor((x - self.origin.x) / self.step + 0.5).astype(np.int64)
+        cy = np.floor((y - self.origin.y) / self.step + 0.5).astype(np.int64)
+        self._cell_min = (int(cx.min()), int(cy.min()))
+        self._cell_max = (int(cx.max()), int(cy.max()))
+        self._grid_width = self._cell_max[0] - self._cell_min[0] + 1
+        grid_height = self._cell_max[1] - self._cell_min[1] + 1
+        slots = (cy - self._cell_min[1]) * self._grid_width + (cx - self._cell_min[0])
+        order = np.argsort(slots, kind="stable")
+        slots = slots[order]
+        last = np.ones(len(order), dtype=bool)
+        last[:-1] = slots[1:] != slots[:-1]
+        chain = np.full(len(order), -1, dtype=np.int32)
+        chain[order[:-1]] = np.where(last[:-1], -1, order[1:])
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = last[:-1]
+        heads = np.full(self._grid_width * grid_height, -1, dtype=np.int32)
+        heads[slots[first]] = order[first]
+        self._heads = array("i", heads.tobytes())
+        self._chain = array("i", chain.tobytes())
+
+    def nearest_index(self, pos: pygame.Vector2) -> int:
+        if not self._heads:
+            return -1
+        x, y = pos.x, pos.y
+        cx, cy = self.cell(x, y)
+        min_x, min_y = self._cell_min
+        max_x, max_y = self._cell_max
+        max_ring = max(abs(cx - min_x), abs(cx - max_x), abs(cy - min_y), abs(cy - max_y))
+
+        best_index = -1
         best_dist = float("inf")
-        for node in self.nodes:
-            dist = (node.pos - pos).length_squared()
-            if dist < best_dist:
-                best_dist = dist
-                best = node
+        heads = self._heads
+        chain = self._chain
+        width = self._grid_width
+        xs = self.xs
+        ys = self.ys
+        blocked = self.blocked
+        for ring in range(max_ring + 1):
+            if ring > 1:
+                reach = (ring - 1) * self.step
+                if reach * reach > best_dist:
+                    break
+            for gx, gy in _ring_cells(cx, cy, ring):
+                if gx < min_x or gx > max_x or gy < min_y or gy > max_y:
+                    continue
+                index = heads[(gy - min_y) * width + (gx - min_x)]
+                while index >= 0:
+                    if blocked is not None and blocked[index]:
+                        index = chain[index]
+                        continue
+                    dx = xs[index] - x
+                    dy = ys[index] - y
+                    dist = dx * dx + dy * dy
+                    if dist < best_dist or (dist == best_dist and index < best_index):
+                        best_dist = dist
+                        best_index = index
+                    index = chain[index]
+        return best_index
+
+    def nearest_node(self, pos: pygame.Vector2) -> NavNode | None:
+        index = self.nearest_index(pos)
+        if index < 0:
+            return None
+        return self.node(index)
+
+    def nearest_nodes(self, positions: list[pygame.Vector2]) -> list[NavNode | None]:
+        indices = self.nearest_indices(
+            np.array([pos.x for pos in positions], dtype=np.float64),
+            np.array([pos.y for pos in positions], dtype=np.float64),
+        )
+        return [self.node(index) if index >= 0 else None for index in indices.tolist()]
+
+    def nearest_indices(self, px: np.ndarray, py: np.ndarray) -> np.ndarray:
+        best = np.full(len(px), -1, dtype=np.int64)
+        if not self._heads or not len(px):
+            return best
+        if len(px) < NEAREST_BATCH_MIN:
+            for point, (x, y) in enumerate(zip(px.tolist(), py.tolist())):
+                best[point] = self.nearest_index(pygame.Vector2(x, y))
+            return best
+        best_dist = np.full(len(px), np.inf)
+        xs = np.frombuffer(self.xs, dtype=np.float32)
+        ys = np.frombuffer(self.ys, dtype=np.float32)
+        heads = np.frombuffer(self._heads, dtype=np.int32)
+        chain = np.frombuffer(self._chain, dtype=np.int32)
+        blocked = None if self.blocked is None else np.frombuffer(self.blocked, dtype=np.uint8)
+        cx = np.floor((px - self.origin.x) / self.step + 0.5).astype(np.int64)
+        cy = np.floor((py - self.origin.y) / self.step + 0.5).astype(np.int64)
+        min_x, min_y = self._cell_min
+        max_x, max_y = self._cell_max
+        reach = NEAREST_BATCH_RINGS
+        for dy in range(-reach, reach + 1):
+            for dx in range(-reach, reach + 1):
+                gx = cx + dx
+                gy = cy + dy
+                inside = (gx >= min_x) & (gx <= max_x) & (gy >= min_y) & (gy <= max_y)
+                slot = np.where(inside, (gy - min_y) * self._grid_width + (gx - min_x), 0)
+                index = np.where(inside, heads[slot], -1)
+                live = np.flatnonzero(index >= 0)
+                while len(live):
+                    candidate = index[live]
+                    dist = (xs[candidate] - px[live]) ** 2 + (ys[candidate] - py[live]) ** 2
+                    better = (dist < best_dist[live]) | (
+                        (dist == best_dist[live]) & (candidate < best[live])
+                    )
+                    if blocked is not None:
+                        better &= blocked[candidate] == 0
+                    best[live[better]] = candidate[better]
+                    best_dist[live[better]] = dist[better]
+                    index[live] = chain[candidate]
+                    live = live[index[live] >= 0]
+
+        limit = (reach * self.step) ** 2
+        for point in np.flatnonzero(best_dist >= limit).tolist():
+            best[point] = self.nearest_index(pygame.Vector2(px[point], py[point]))
         return best
 
+    def reachable_indices(self, index: int) -> Sequence[int]:
+        if self.blocked is None:
+            return range(len(self))
+        if self._components is None or self._components[0] != self.version:
+            self._components = (self.version, label_components(self.offsets, self.targets), {})
+        _, labels, members = self._components
+        label = int(labels[index])
+        reachable = members.get(label)
+        if reachable is None:
+            reachable = np.flatnonzero(labels == label)
+            members[label] = reachable
+        return reachable
+
+    def repair(self, obstacles: list[list[pygame.Vector2]], area: pygame.Rect) -> list[int]:
+        lattice = self.lattice
+        if lattice is None or self.blocked is None:
+            raise ValueError("nav graph was not built as a lattice; set NAV_BUILDER = 'lattice'")
+        margin = BOT_RADIUS + self.step
+        left = area.left - margin
+        right = area.right + margin
+        top = area.top - margin
+        bottom = area.bottom + margin
+        i0, i1 = np.searchsorted(lattice.columns, [left, right], side="left")
+        j0, j1 = np.searchsorted(lattice.rows, [top, bottom], side="left")
+        i1 = min(len(lattice.columns), i1 + 1)
+        j1 = min(len(lattice.rows), j1 + 1)
+        if i0 >= i1 or j0 >= j1:
+            return []
+
+        left = lattice.columns[i0] - BOT_RADIUS
+        right = lattice.columns[i1 - 1] + BOT_RADIUS
+        top = lattice.rows[j0] - BOT_RADIUS
+        bottom = lattice.rows[j1 - 1] + BOT_RADIUS
+        nearby = []
+        for poly in obstacles:
+            if not poly:
+                continue
+            if (
+                max(p.x for p in poly) < left
+                or min(p.x for p in poly) > right
+                or max(p.y for p in poly) < top
+                or min(p.y for p in poly) > bottom
+            ):
+                continue
+            nearby.append(poly)
+        free = occupancy_grid(
+            lattice.columns[i0:i1], lattice.rows[j0:j1], nearby, BOT_RADIUS, lattice.bounds
+        )
+
+        width = len(lattice.columns)
+        blocked = self.blocked
+        changed = []
+        for j, row in enumerate(free.tolist(), start=j0):
+            base = j * width
+            for i, is_free in enumerate(row, start=i0):
+                index = base + i
+                if blocked[index] == is_free:
+                    blocked[index] = not is_free
+                    changed.append(index)
+        for index in changed:
+            self._relink(index)
+        if changed:
+            self.version += 1
+        return changed
+
+    def _relink(self, index: int) -> None:
+        original = self.lattice.targets
+        offsets = self.offsets
+        targets = self.targets
+        costs = self.costs
+        blocked = self.blocked
+        for k in range(offsets[index], offsets[index + 1]):
+            neighbor = original[k]
+            linked = not blocked[index] and not blocked[neighbor]
+            cost = self.distance(index, neighbor) if linked else 0.0
+            targets[k] = neighbor if linked else index
+            costs[k] = cost
+            for back in range(offsets[neighbor], offsets[neighbor + 1]):
+                if original[back] == index:
+                    targets[back] = index if linked else neighbor
+                    costs[back] = cost
+                    break
+
+
+class NodeView(Sequence):
+    def __init__(self, graph: NavGraph):
+        self._graph = graph
+
+    def __len__(self) -> int:
+        return len(self._graph.xs)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._graph.node(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self._graph.node(index)
 
-def generate_nav_graph(obstacles: list[list[pygame.Vector2]]) -> NavGraph:
+
+class EdgeView(Mapping):
+    def __init__(self, graph: NavGraph):
+        self._graph = graph
+
+    def __len__(self) -> int:
+        return len(self._graph.xs)
+
+    def __iter__(self):
+        return iter(range(len(self._graph.xs)))
+
+    def __getitem__(self, index: int) -> array:
+        offsets = self._graph.offsets
+        if not 0 <= index < len(offsets) - 1:
+            raise KeyError(index)
+        return self._graph.targets[offsets[index] : offsets[index + 1]]
+
+
+def _ring_cells(cx: int, cy: int, ring: int):
+    if ring == 0:
+        yield (cx, cy)
+        return
+    for dx in range(-ring, ring + 1):
+        yield (cx + dx, cy - ring)
+        yield (cx + dx, cy + ring)
+    for dy in range(-ring + 1, ring):
+        yield (cx - ring, cy + dy)
+        yield (cx + ring, cy + dy)
+
+
+def label_components(offsets: array, targets: array) -> np.ndarray:
+    offsets = np.frombuffer(offsets, dtype=np.int32)
+    targets = np.frombuffer(targets, dtype=np.int32)
+    count = len(offsets) - 1
+    sources = np.repeat(np.arange(count, dtype=np.int32), np.diff(offsets))
+    labels = np.arange(count, dtype=np.int32)
+    while True:
+        a = labels[sources]
+        b = labels[targets]
+        split = a != b
+        if not split.any():
+            return labels
+        np.minimum.at(labels, np.maximum(a[split], b[split]), np.minimum(a[split], b[split]))
+        while True:
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels = jumped
+
+
+def generate_nav_graph(
+    obstacles: list[list[pygame.Vector2]],
+    bounds: pygame.Rect = MAP_BOUNDS,
+    seed: pygame.Vector2 = NAV_SEED,
+) -> NavGraph:
+    if NAV_BUILDER == "raster":
+        return generate_nav_graph_raster(obstacles, bounds, seed)
+    if NAV_BUILDER == "lattice":
+        return generate_nav_lattice(obstacles, bounds, seed)
+    return generate_nav_graph_flood(obstacles, bounds, seed)
+
+
+def generate_nav_graph_flood(
+    obstacles: list[list[pygame.Vector2]],
+    bounds: pygame.Rect = MAP_BOUNDS,
+    seed: pygame.Vector2 = NAV_SEED,
+) -> NavGraph:
     step = NAV_STEP
     radius = BOT_RADIUS
+    if not isinstance(obstacles, ObstacleSet):
+        obstacles = ObstacleSet(obstacles)
 
     def key(pos: pygame.Vector2) -> tuple[int, int]:
         return (int(round(pos.x)), int(round(pos.y)))
 
     def valid(pos: pygame.Vector2) -> bool:
-        if not MAP_BOUNDS.collidepoint(pos.x, pos.y):
+        if not bounds.collidepoint(pos.x, pos.y):
             return False
-        for poly in obstacles:
-            if circle_intersects_polygon(pos, radius, poly):
-                return False
-        return True
+        return not obstacles.circle_blocked(pos, radius)
 
     nodes: list[NavNode] = []
     edges: dict[int, list[int]] = {}
     visited: dict[tuple[int, int], int] = {}
 
     queue = deque()
-    if valid(NAV_SEED):
-        queue.append(NAV_SEED)
-        visited[key(NAV_SEED)] = 0
-        nodes.append(NavNode(0, NAV_SEED))
+    if valid(seed):
+        queue.append(seed)
+        visited[key(seed)] = 0
+        nodes.append(NavNode(0, seed))
 
     directions = [
         pygame.Vector2(step, 0),
@@ -84,4 +476,195 @@ def generate_nav_graph(obstacles: list[list[pygame.Vector2]]) -> NavGraph:
             neighbor_index = visited[c_key]
             edges[current_index].append(neighbor_index)
 
-    return NavGraph(nodes, edges)
+    return NavGraph(nodes, edges, seed)
+
+
+def generate_nav_graph_raster(
+    obstacles: list[list[pygame.Vector2]],
+    bounds: pygame.Rect = MAP_BOUNDS,
+    seed: pygame.Vector2 = NAV_SEED,
+) -> NavGraph:
+    step = NAV_STEP
+    seed_x, seed_y = seed.x, seed.y
+
+    i_min = math.floor((bounds.left - seed_x) / step) - 1
+    i_max = math.ceil((bounds.right - seed_x) / step) + 1
+    j_min = math.floor((bounds.top - seed_y) / step) - 1
+    j_max = math.ceil((bounds.bottom - seed_y) / step) + 1
+    xs = seed_x + np.arange(i_min, i_max + 1, dtype=np.float64) * step
+    ys = seed_y + np.arange(j_min, j_max + 1, dtype=np.float64) * step
+
+    free = occupancy_grid(xs, ys, obstacles, BOT_RADIUS, bounds)
+    width = len(xs)
+    height = len(ys)
+    seed_cell = -j_min * width - i_min
+    free = free.ravel()
+    if not free[seed_cell]:
+        return NavGraph([], {}, seed)
+
+    order = np.full(width * height, -1, dtype=np.int32)
+    order[seed_cell] = 0
+    layers = [np.array([seed_cell], dtype=np.int64)]
+    count = 1
+    frontier = layers[0]
+    while len(frontier):
+        ci = frontier % width
+        cj = frontier // width
+        rank = np.arange(len(frontier))
+        cells = []
+        keys = []
+        for d, (di, dj) in enumerate(NAV_DIRECTIONS):
+            ni = ci + di
+            nj = cj + dj
+            inside = (ni >= 0) & (nj >= 0) & (ni < width) & (nj < height)
+            cell = nj[inside] * width + ni[inside]
+            fresh = free[cell] & (order[cell] < 0)
+            cells.append(cell[fresh])
+            keys.append(rank[inside][fresh] * len(NAV_DIRECTIONS) + d)
+        keys = np.concatenate(keys)
+        by_key = np.argsort(keys, kind="stable")
+        cells, first = np.unique(np.concatenate(cells)[by_key], return_index=True)
+        frontier = cells[np.argsort(first)]
+        order[frontier] = np.arange(count, count + len(frontier), dtype=np.int32)
+        count += len(frontier)
+        layers.append(frontier)
+
+    nodes = np.concatenate(layers)
+    node_i = nodes % width
+    node_j = nodes // width
+    neighbors = np.empty((count, len(NAV_DIRECTIONS)), dtype=np.int32)
+    present = np.empty((count, len(NAV_DIRECTIONS)), dtype=bool)
+    for d, (di, dj) in enumerate(NAV_DIRECTIONS):
+        ni = node_i + di
+        nj = node_j + dj
+        inside = (ni >= 0) & (nj >= 0) & (ni < width) & (nj < height)
+        cell = np.where(inside, nj * width + ni, 0)
+        present[:, d] = inside & free[cell]
+        neighbors[:, d] = order[cell]
+    offsets = np.zeros(count + 1, dtype=np.int32)
+    np.cumsum(present.sum(axis=1), out=offsets[1:])
+
+    return NavGraph.from_arrays(
+        array("f", xs[node_i].astype(np.float32).tobytes()),
+        array("f", ys[node_j].astype(np.float32).tobytes()),
+        array("i", offsets.tobytes()),
+        array("i", neighbors[present].tobytes()),
+        seed,
+    )
+
+
+def generate_nav_lattice(
+    obstacles: list[list[pygame.Vector2]],
+    bounds: pygame.Rect = MAP_BOUNDS,
+    seed: pygame.Vector2 = NAV_SEED,
+) -> NavGraph:
+    step = NAV_STEP
+    i_min = math.floor((bounds.left - seed.x) / step)
+    i_max = math.ceil((bounds.right - seed.x) / step)
+    j_min = math.floor((bounds.top - seed.y) / step)
+    j_max = math.ceil((bounds.bottom - seed.y) / step)
+    columns = seed.x + np.arange(i_min, i_max + 1, dtype=np.float64) * step
+    rows = seed.y + np.arange(j_min, j_max + 1, dtype=np.float64) * step
+    width = len(columns)
+    height = len(rows)
+    count = width * height
+    free = occupancy_grid(columns, rows, obstacles, BOT_RADIUS, bounds).ravel()
+
+    cell_i = np.tile(np.arange(width), height)
+    cell_j = np.repeat(np.arange(height), width)
+    neighbors = np.empty((len(NAV_DIRECTIONS), count), dtype=np.int64)
+    present = np.empty((len(NAV_DIRECTIONS), count), dtype=bool)
+    for d, (di, dj) in enumerate(NAV_DIRECTIONS):
+        ni = cell_i + di
+        nj = cell_j + dj
+        present[d] = (ni >= 0) & (nj >= 0) & (ni < width) & (nj < height)
+        neighbors[d] = nj * width + ni
+    degree = present.sum(axis=0)
+    offsets = np.zeros(count + 1, dtype=np.int32)
+    np.cumsum(degree, out=offsets[1:])
+    slots = offsets[:-1] + np.cumsum(present, axis=0) - present
+    original = np.empty(int(offsets[-1]), dtype=np.int32)
+    original[slots[present]] = neighbors[present]
+    sources = np.repeat(np.arange(count, dtype=np.int32), degree)
+    linked = free[sources] & free[original]
+    targets = np.where(linked, original, sources).astype(np.int32)
+
+    graph = NavGraph.from_arrays(
+        array("f", np.tile(columns, height).astype(np.float32).tobytes()),
+        array("f", np.repeat(rows, width).astype(np.float32).tobytes()),
+        array("i", offsets.tobytes()),
+        array("i", targets.tobytes()),
+        seed,
+        step,
+    )
+    graph.blocked = bytearray((~free).astype(np.uint8).tobytes())
+    graph.lattice = Lattice(columns, rows, pygame.Rect(bounds), array("i", original.tobytes()))
+    return graph
+
+
+def occupancy_grid(
+    xs: np.ndarray,
+    ys: np.ndarray,
+    obstacles: list[list[pygame.Vector2]],
+    radius: float,
+    bounds: pygame.Rect = MAP_BOUNDS,
+) -> np.ndarray:
+    px = np.trunc(xs)
+    py = np.trunc(ys)
+    free = np.logical_and.outer(
+        (py >= bounds.top) & (py < bounds.bottom),
+        (px >= bounds.left) & (px < bounds.right),
+    )
+
+    for poly in obstacles:
+        if len(poly) == 0:
+            continue
+        left = min(p.x for p in poly) - radius
+        right = max(p.x for p in poly) + radius
+        top = min(p.y for p in poly) - radius
+        bottom = max(p.y for p in poly) + radius
+        i0, i1 = np.searchsorted(xs, [left, right], side="left")
+        j0, j1 = np.searchsorted(ys, [top, bottom], side="left")
+        i1 = min(len(xs), i1 + 1)
+        j1 = min(len(ys), j1 + 1)
+        if i0 >= i1 or j0 >= j1:
+            continue
+        gx, gy = np.meshgrid(xs[i0:i1], ys[j0:j1])
+        blocked = _circle_hits_polygon(gx, gy, radius, poly)
+        free[j0:j1, i0:i1] &= ~blocked
+    return free
+
+
+def _circle_hits_polygon(
+    px: np.ndarray, py: np.ndarray, radius: float, polygon: list[pygame.Vector2]
+) -> np.ndarray:
+    count = len(polygon)
+    inside = np.zeros(px.shape, dtype=bool)
+    if count >= 3:
+        j = count - 1
+        for i in range(count):
+            pi = polygon[i]
+            pj = polygon[j]
+            crosses = ((pi.y > py) != (pj.y > py)) & (
+                px < (pj.x - pi.x) * (py - pi.y) / (pj.y - pi.y + EPS) + pi.x
+            )
+            inside ^= crosses
+            j = i
+
+    hit = inside
+    for i in range(count):
+        a = polygon[i]
+        b = polygon[(i + 1) % count]
+        abx = b.x - a.x
+        aby = b.y - a.y
+        denom = abx * abx + aby * aby
+        if denom <= EPS:
+            dx = px - a.x
+            dy = py - a.y
+        else:
+            t = ((px - a.x) * abx + (py - a.y) * aby) / denom
+            t = np.clip(t, 0.0, 1.0)
+            dx = px - (a.x + abx * t)
+            dy = py - (a.y + aby * t)
+        hit |= np.sqrt(dx * dx + dy * dy) <= radius
+    return hit
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import struct
+import sys
+from array import array
+
+import numpy as np
+import pygame
+
+from src.core.config import BOT_RADIUS, MAP_BOUNDS, NAV_BUILDER, NAV_CACHE_DIR, NAV_SEED, NAV_STEP
+from src.nav.graph import NavGraph, generate_nav_graph
+
+CACHE_MAGIC = b"NAVG"
+CACHE_VERSION = 2
+HEADER = struct.Struct("<4sIQQddd")
+
+
+def nav_cache_key(
+    obstacles: list[list[pygame.Vector2]],
+    bounds: pygame.Rect = MAP_BOUNDS,
+    seed: pygame.Vector2 = NAV_SEED,
+) -> str:
+    digest = hashlib.sha256()
+    digest.update(struct.pack("<I", CACHE_VERSION))
+    digest.update(NAV_BUILDER.encode())
+    digest.update(struct.pack("<ddd", seed.x, seed.y, NAV_STEP))
+    digest.update(struct.pack("<d", BOT_RADIUS))
+    digest.update(struct.pack("<4q", bounds.x, bounds.y, bounds.w, bounds.h))
+    for poly in obstacles:
+        digest.update(struct.pack("<I", len(poly)))
+        for point in poly:
+            digest.update(struct.pack("<dd", point.x, point.y))
+    return digest.hexdigest()
+
+
+def load_or_build_nav_graph(
+    obstacles: list[list[pygame.Vector2]],
+    cache_dir: str = NAV_CACHE_DIR,
+    bounds: pygame.Rect = MAP_BOUNDS,
+    seed: pygame.Vector2 = NAV_SEED,
+) -> NavGraph:
+    if not cache_dir or NAV_BUILDER == "lattice":
+        return generate_nav_graph(obstacles, bounds, seed)
+    path = os.path.join(cache_dir, f"{nav_cache_key(obstacles, bounds, seed)}.nav")
+    if os.path.exists(path):
+        try:
+            return load_nav_graph(path)
+        except (OSError, ValueError):
+            pass
+    graph = generate_nav_graph(obstacles, bounds, seed)
+    save_nav_graph(graph, path)
+    return graph
+
+
+def save_nav_graph(graph: NavGraph, path: str) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as handle:
+        handle.write(
+            HEADER.pack(
+                CACHE_MAGIC,
+                CACHE_VERSION,
+                len(graph),
+                len(graph.targets),
+                graph.origin.x,
+                graph.origin.y,
+                graph.step,
+            )
+        )
+        handle.write(np.frombuffer(graph.xs, dtype=np.float32).astype("<f4").tobytes())
+        handle.write(np.frombuffer(graph.ys, dtype=np.float32).astype("<f4").tobytes())
+        handle.write(np.frombuffer(graph.offsets, dtype=np.int32).astype("<i4").tobytes())
+        handle.write(np.frombuffer(graph.targets, dtype=np.int32).astype("<i4").tobytes())
+    os.replace(tmp_path, path)
+
+
+def load_nav_graph(path: str) -> NavGraph:
+    with open(path, "rb") as handle:
+        header = handle.read(HEADER.size)
+        if len(header) != HEADER.size:
+            raise ValueError(f"truncated nav cache: {path}")
+        magic, version, count, edge_count, origin_x, origin_y, step = HEADER.unpack(header)
+        if magic != CACHE_MAGIC or version != CACHE_VERSION:
+            raise ValueError(f"unsupported nav cache: {path}")
+        data = memoryview(handle.read())
+
+    if len(data) != count * 8 + (count + 1) * 4 + edge_count * 4:
+        raise ValueError(f"truncated nav cache: {path}")
+    cursor = 0
+    xs = _read_array("f", data[cursor : cursor + count * 4])
+    cursor += count * 4
+    ys = _read_array("f", data[cursor : cursor + count * 4])
+    cursor += count * 4
+    offsets = _read_array("i", data[cursor : cursor + (count + 1) * 4])
+    cursor += (count + 1) * 4
+    targets = _read_array("i", data[cursor : cursor + edge_count * 4])
+
+    return NavGraph.from_arrays(xs, ys, offsets, targets, pygame.Vector2(origin_x, origin_y), step)
+
+
+def _read_array(typecode: str, data: memoryview) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
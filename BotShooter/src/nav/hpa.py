@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import heapq
+from array import array
+from collections.abc import Collection, Iterable
+
+from src.nav.graph import NavGraph
+
+ENTRANCE_SPLIT_LENGTH = 6
+
+
+class HierarchicalGraph:
+    def __init__(self, graph: NavGraph, cluster_size: int):
+        self.graph = graph
+        self.cluster_size = cluster_size
+        self.version = graph.version
+        self.cluster = array("i", bytes(4 * len(graph)))
+        self.members: dict[int, list[int]] = {}
+        self.entrances: dict[int, list[int]] = {}
+        self.abstract: dict[int, list[tuple[int, float]]] = {}
+        self.transitions: dict[tuple, list[tuple[int, int, float]]] = {}
+        self._borders: dict[int, set[tuple]] = {}
+        self._segments: dict[tuple[int, int], list[int]] = {}
+        self._assign_clusters()
+        self._find_entrances(range(len(graph)))
+        self._link_entrances(self.members)
+
+    def repair(self, changed: list[int]) -> None:
+        cluster = self.cluster
+        affected = {cluster[index] for index in changed}
+        touched = set(affected)
+        for cluster_id in affected:
+            for key in list(self._borders.get(cluster_id, ())):
+                del self.transitions[key]
+                for side in key[:2]:
+                    self._borders[side].discard(key)
+                    touched.add(side)
+        nodes = [index for cluster_id in sorted(affected) for index in self.members[cluster_id]]
+        for key in self._find_entrances(nodes, affected):
+            touched.update(key[:2])
+        self._link_entrances(touched)
+        self._segments = {
+            key: segment
+            for key, segment in self._segments.items()
+            if cluster[key[0]] not in touched
+        }
+        self.version = self.graph.version
+
+    def _assign_clusters(self) -> None:
+        graph = self.graph
+        size = self.cluster_size
+        ids: dict[tuple[int, int], int] = {}
+        for index in range(len(graph)):
+            cx, cy = graph.cell(graph.xs[index], graph.ys[index])
+            key = (cx // size, cy // size)
+            cluster_id = ids.get(key)
+            if cluster_id is None:
+                cluster_id = len(ids)
+                ids[key] = cluster_id
+            self.cluster[index] = cluster_id
+            self.members.setdefault(cluster_id, []).append(index)
+
+    def _find_entrances(
+        self, nodes: Iterable[int], clusters: set[int] | None = None
+    ) -> list[tuple]:
+        graph = self.graph
+        cluster = self.cluster
+        borders: dict[tuple, list[tuple[int, int, int, float]]] = {}
+        for index in nodes:
+            cx, cy = graph.cell(graph.xs[index], graph.ys[index])
+            for k in range(graph.offsets[index], graph.offsets[index + 1]):
+                neighbor = graph.targets[k]
+                if cluster[neighbor] == cluster[index]:
+                    continue
+                if neighbor < index and (clusters is None or cluster[neighbor] in clusters):
+                    continue
+                nx, ny = graph.cell(graph.xs[neighbor], graph.ys[neighbor])
+                if nx != cx and ny != cy:
+                    continue
+                pair = (min(cluster[index], cluster[neighbor]), max(cluster[index], cluster[neighbor]))
+                if nx != cx:
+                    key = (*pair, "x", max(cx, nx))
+                    along = cy
+                else:
+                    key = (*pair, "y", max(cy, ny))
+                    along = cx
+                a, b = min(index, neighbor), max(index, neighbor)
+                borders.setdefault(key, []).append((along, a, b, graph.costs[k]))
+
+        for key, pairs in borders.items():
+            pairs.sort()
+            chosen = []
+            run = [pairs[0]]
+            for pair in pairs[1:]:
+                if pair[0] == run[-1][0] + 1:
+                    run.append(pair)
+                    continue
+                chosen.extend(_entrances(run))
+                run = [pair]
+            chosen.extend(_entrances(run))
+            self.transitions[key] = chosen
+            for side in key[:2]:
+                self._borders.setdefault(side, set()).add(key)
+        return list(borders)
+
+    def _link_entrances(self, clusters: Collection[int]) -> None:
+        cluster = self.cluster
+        for cluster_id in clusters:
+            for node in self.entrances.pop(cluster_id, []):
+                del self.abstract[node]
+        for cluster_id in clusters:
+            nodes: list[int] = []
+            for key in sorted(self._borders.get(cluster_id, ())):
+                for a, b, cost in self.transitions[key]:
+                    for node, other in ((a, b), (b, a)):
+                        if cluster[node] != cluster_id:
+                            continue
+                        if node not in self.abstract:
+                            self.abstract[node] = []
+                            nodes.append(node)
+                        self.abstract[node].append((other, cost))
+            if not nodes:
+                continue
+            self.entrances[cluster_id] = nodes
+            for node in nodes:
+                dist = self._cluster_distances(node, cluster_id)
+                for other in nodes:
+                    if other != node and other in dist:
+                        self.abstract[node].append((other, dist[other]))
+
+    def _cluster_distances(self, source: int, cluster_id: int) -> dict[int, float]:
+        graph = self.graph
+        cluster = self.cluster
+        dist = {source: 0.0}
+        heap = [(0.0, source)]
+        while heap:
+            current_dist, current = heapq.heappop(heap)
+            if current_dist > dist[current]:
+                continue
+            for k in range(graph.offsets[current], graph.offsets[current + 1]):
+                neighbor = graph.targets[k]
+                if cluster[neighbor] != cluster_id:
+                    continue
+                candidate = current_dist + graph.costs[k]
+                if candidate < dist.get(neighbor, float("inf")):
+                    dist[neighbor] = candidate
+                    heapq.heappush(heap, (candidate, neighbor))
+        return dist
+
+    def find_path(self, start: int, goal: int, refine_all: bool = True) -> list[int]:
+        if start == goal:
+            return [start]
+        route = self.abstract_path(start, goal)
+        if not route:
+            return []
+        path = [start]
+        for position, (a, b) in enumerate(zip(route, route[1:])):
+            if not refine_all and position > 0:
+                path.append(b)
+                continue
+            segment = self.refine(a, b)
+            if not segment:
+                return []
+            path.extend(segment[1:])
+        return path
+
+    def abstract_path(self, start: int, goal: int) -> list[int]:
+        graph = self.graph
+        start_links = self._entrance_links(start, goal)
+        goal_links = self._entrance_links(goal)
+        if not start_links or (not goal_links and goal not in start_links):
+            return []
+
+        g_score = {start: 0.0}
+        parent = {start: -1}
+        closed: set[int] = set()
+        heap = [(graph.distance(start, goal), start)]
+        while heap:
+            _, current = heapq.heappop(heap)
+            if current in closed:
+                continue
+            closed.add(current)
+            if current == goal:
+                route = [current]
+                while parent[current] >= 0:
+                    current = parent[current]
+                    route.append(current)
+                route.reverse()
+                return route
+
+            links = self.abstract.get(current, [])
+            if current == start:
+                links = [*start_links.items(), *links]
+            if current in goal_links:
+                links = [*links, (goal, goal_links[current])]
+            for neighbor, cost in links:
+                if neighbor in closed:
+                    continue
+                tentative = g_score[current] + cost
+                if tentative >= g_score.get(neighbor, float("inf")):
+                    continue
+                g_score[neighbor] = tentative
+                parent[neighbor] = current
+                heapq.heappush(heap, (tentative + graph.distance(neighbor, goal), neighbor))
+        return []
+
+    def _entrance_links(self, node: int, goal: int = -1) -> dict[int, float]:
+        cluster_id = self.cluster[node]
+        dist = self._cluster_distances(node, cluster_id)
+        links = {
+            entrance: dist[entrance]
+            for entrance in self.entrances.get(cluster_id, [])
+            if entrance in dist
+        }
+        if goal in dist:
+            links[goal] = dist[goal]
+        return links
+
+    def refine(self, a: int, b: int) -> list[int]:
+        cluster = self.cluster
+        if cluster[a] != cluster[b]:
+            return [a, b]
+        key = (a, b)
+        cached = self._segments.get(key)
+        if cached is not None:
+            return cached
+        segment = self._cluster_astar(a, b, cluster[a])
+        if a in self.abstract and b in self.abstract:
+            self._segments[key] = segment
+        return segment
+
+    def _cluster_astar(self, start: int, goal: int, cluster_id: int) -> list[int]:
+        graph = self.graph
+        cluster = self.cluster
+        g_score = {start: 0.0}
+        parent = {start: -1}
+        closed: set[int] = set()
+        heap = [(graph.distance(start, goal), start)]
+        while heap:
+            _, current = heapq.heappop(heap)
+            if current in closed:
+                continue
+            closed.add(current)
+            if current == goal:
+                path = [current]
+                while parent[current] >= 0:
+                    current = parent[current]
+                    path.append(current)
+                path.reverse()
+                return path
+            for k in range(graph.offsets[current], graph.offsets[current + 1]):
+                neighbor = graph.targets[k]
+                if cluster[neighbor] != cluster_id or neighbor in closed:
+                    continue
+                tentative = g_score[current] + graph.costs[k]
+                if tentative >= g_score.get(neighbor, float("inf")):
+                    continue
+                g_score[neighbor] = tentative
+                parent[neighbor] = current
+                heapq.heappush(heap, (tentative + graph.distance(neighbor, goal), neighbor))
+        return []
+
+
+def _entrances(run: list[tuple[int, int, int, float]]) -> list[tuple[int, int, float]]:
+    if len(run) >= ENTRANCE_SPLIT_LENGTH:
+        chosen = [run[0], run[-1]]
+    else:
+        chosen = [run[len(run) // 2]]
+    return [(a, b, cost) for _, a, b, cost in chosen]
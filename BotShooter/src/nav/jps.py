@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import heapq
+import math
+from array import array
+
+from src.nav.graph import NavGraph
+
+ALL_DIRECTIONS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1))
+
+
+class JumpPointSearch:
+    def __init__(self, graph: NavGraph):
+        self.graph = graph
+        self.version = graph.version
+        self.straight_cost = graph.step
+        self.diagonal_cost = array("f", [math.hypot(graph.step, graph.step)])[0]
+
+        cells = [graph.cell(x, y) for x, y in zip(graph.xs, graph.ys)]
+        self.cell_x = array("i", (c[0] for c in cells))
+        self.cell_y = array("i", (c[1] for c in cells))
+        if cells:
+            self.min_x = min(self.cell_x)
+            self.min_y = min(self.cell_y)
+            self.width = max(self.cell_x) - self.min_x + 1
+            self.height = max(self.cell_y) - self.min_y + 1
+        else:
+            self.min_x = self.min_y = 0
+            self.width = self.height = 0
+        self.grid = array("i", [-1]) * (self.width * self.height)
+        self.walkable = bytearray((self.width + 2) * (self.height + 2))
+        for index, (cx, cy) in enumerate(cells):
+            if graph.blocked is not None and graph.blocked[index]:
+                continue
+            self.grid[(cy - self.min_y) * self.width + (cx - self.min_x)] = index
+            self.walkable[(cy - self.min_y + 1) * (self.width + 2) + (cx - self.min_x + 1)] = 1
+
+    def sync(self, indices: list[int]) -> None:
+        blocked = self.graph.blocked
+        for index in indices:
+            gx = self.cell_x[index] - self.min_x
+            gy = self.cell_y[index] - self.min_y
+            free = not blocked[index]
+            self.grid[gy * self.width + gx] = index if free else -1
+            self.walkable[(gy + 1) * (self.width + 2) + gx + 1] = free
+        self.version = self.graph.version
+
+    def node_at(self, x: int, y: int) -> int:
+        gx = x - self.min_x
+        gy = y - self.min_y
+        if gx < 0 or gy < 0 or gx >= self.width or gy >= self.height:
+            return -1
+        return self.grid[gy * self.width + gx]
+
+    def free(self, x: int, y: int) -> bool:
+        return self.node_at(x, y) >= 0
+
+    def find_path(self, start: int, goal: int) -> list[int]:
+        stats = self.graph.stats
+        stats.searches += 1
+        if start == goal:
+            return [start]
+
+        goal_x = self.cell_x[goal]
+        goal_y = self.cell_y[goal]
+        start_cell = (self.cell_x[start], self.cell_y[start])
+        goal_cell = (goal_x, goal_y)
+
+        g_score = {start_cell: 0.0}
+        parent: dict[tuple[int, int], tuple[int, int] | None] = {start_cell: None}
+        closed: set[tuple[int, int]] = set()
+        heap = [(self.octile(start_cell[0], start_cell[1], goal_x, goal_y), start_cell)]
+        expanded = 0
+
+        while heap:
+            _, current = heapq.heappop(heap)
+            if current in closed:
+                continue
+            closed.add(current)
+            expanded += 1
+            if current == goal_cell:
+                stats.expanded += expanded
+                return self._expand(self._jump_points(parent, current))
+
+            x, y = current
+            for dx, dy in self._directions(current, parent[current]):
+                jump = self._jump(x, y, dx, dy, goal_x, goal_y)
+                if jump is None or jump in closed:
+                    continue
+                steps = max(abs(jump[0] - x), abs(jump[1] - y))
+                cost = self.diagonal_cost if dx and dy else self.straight_cost
+                tentative = g_score[current] + steps * cost
+                if tentative >= g_score.get(jump, float("inf")):
+                    continue
+                g_score[jump] = tentative
+                parent[jump] = current
+                heapq.heappush(
+                    heap, (tentative + self.octile(jump[0], jump[1], goal_x, goal_y), jump)
+                )
+
+        stats.expanded += expanded
+        return []
+
+    def octile(self, x: int, y: int, goal_x: int, goal_y: int) -> float:
+        dx = abs(goal_x - x)
+        dy = abs(goal_y - y)
+        return self.straight_cost * abs(dx - dy) + self.diagonal_cost * min(dx, dy)
+
+    def _directions(
+        self, current: tuple[int, int], previous: tuple[int, int] | None
+    ) -> list[tuple[int, int]]:
+        if previous is None:
+            return list(ALL_DIRECTIONS)
+        x, y = current
+        dx = (x > previous[0]) - (x < previous[0])
+        dy = (y > previous[1]) - (y < previous[1])
+        free = self.free
+        if dx and dy:
+            directions = [(dx, 0), (0, dy), (dx, dy)]
+            if not free(x - dx, y):
+                directions.append((-dx, dy))
+            if not free(x, y - dy):
+                directions.append((dx, -dy))
+        elif dx:
+            directions = [(dx, 0)]
+            if not free(x, y + 1):
+                directions.append((dx, 1))
+            if not free(x, y - 1):
+                directions.append((dx, -1))
+        else:
+            directions = [(0, dy)]
+            if not free(x + 1, y):
+                directions.append((1, dy))
+            if not free(x - 1, y):
+                directions.append((-1, dy))
+        return directions
+
+    def _jump(
+        self, x: int, y: int, dx: int, dy: int, goal_x: int, goal_y: int
+    ) -> tuple[int, int] | None:
+        walkable = self.walkable
+        stride = self.width + 2
+        offset = 1 - self.min_x + (1 - self.min_y) * stride
+        while True:
+            x += dx
+            y += dy
+            at = offset + y * stride + x
+            if not walkable[at]:
+                return None
+            if x == goal_x and y == goal_y:
+                return (x, y)
+            if dx and dy:
+                if (not walkable[at - dx] and walkable[at - dx + dy * stride]) or (
+                    not walkable[at - dy * stride] and walkable[at + dx - dy * stride]
+                ):
+                    return (x, y)
+                if self._jump(x, y, dx, 0, goal_x, goal_y) is not None:
+                    return (x, y)
+                if self._jump(x, y, 0, dy, goal_x, goal_y) is not None:
+                    return (x, y)
+            elif dx:
+                if (not walkable[at + stride] and walkable[at + stride + dx]) or (
+                    not walkable[at - stride] and walkable[at - stride + dx]
+                ):
+                    return (x, y)
+            else:
+                if (not walkable[at + 1] and walkable[at + 1 + dy * stride]) or (
+                    not walkable[at - 1] and walkable[at - 1 + dy * stride]
+                ):
+                    return (x, y)
+
+    def _jump_points(
+        self, parent: dict[tuple[int, int], tuple[int, int] | None], current: tuple[int, int]
+    ) -> list[tuple[int, int]]:
+        points = [current]
+        while parent[current] is not None:
+            current = parent[current]
+            points.append(current)
+        points.reverse()
+        return points
+
+    def _expand(self, points: list[tuple[int, int]]) -> list[int]:
+        path = [self.node_at(*points[0])]
+        for (x0, y0), (x1, y1) in zip(points, points[1:]):
+            dx = (x1 > x0) - (x1 < x0)
+            dy = (y1 > y0) - (y1 < y0)
+            x, y = x0, y0
+            while (x, y) != (x1, y1):
+                x += dx
+                y += dy
+                path.append(self.node_at(x, y))
+        return path
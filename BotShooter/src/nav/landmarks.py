@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import heapq
+
+from src.nav.graph import NavGraph
+
+
+class Landmarks:
+    def __init__(self, graph: NavGraph, landmark_indices: list[int], tables: list[list[float]]):
+        self.graph = graph
+        self.version = graph.version
+        self.landmark_indices = landmark_indices
+        self.node_distances: list[tuple[float, ...]] = [
+            tuple(table[i] for table in tables) for i in range(len(graph))
+        ]
+
+    @classmethod
+    def build(cls, graph: NavGraph, count: int) -> Landmarks:
+        if not len(graph) or count <= 0:
+            return cls(graph, [], [])
+
+        source = 0 if graph.blocked is None else max(0, graph.blocked.find(0))
+        seed_dist = dijkstra_distances(graph, source)
+        first = max(range(len(graph)), key=lambda i: _finite(seed_dist[i]))
+        landmark_indices = [first]
+        tables = [dijkstra_distances(graph, first)]
+        closest = list(tables[0])
+
+        while len(landmark_indices) < min(count, len(graph)):
+            candidate = max(range(len(graph)), key=lambda i: _finite(closest[i]))
+            if closest[candidate] <= 0.0:
+                break
+            landmark_indices.append(candidate)
+            table = dijkstra_distances(graph, candidate)
+            tables.append(table)
+            closest = [min(a, b) for a, b in zip(closest, table)]
+
+        return cls(graph, landmark_indices, tables)
+
+    def repair(self, changed: list[int]) -> None:
+        graph = self.graph
+        offsets = graph.offsets
+        targets = graph.targets
+        costs = graph.costs
+        blocked = graph.blocked
+        freed = [index for index in changed if blocked is None or not blocked[index]]
+        node_distances = self.node_distances
+        updated: dict[int, list[float]] = {}
+        for column in range(len(self.landmark_indices)):
+            dist: dict[int, float] = {}
+            heap: list[tuple[float, int]] = []
+            for index in freed:
+                for k in range(offsets[index], offsets[index + 1]):
+                    heap.append((node_distances[targets[k]][column] + costs[k], index))
+            heapq.heapify(heap)
+            while heap:
+                current_dist, current = heapq.heappop(heap)
+                if current_dist >= dist.get(current, node_distances[current][column]):
+                    continue
+                dist[current] = current_dist
+                for k in range(offsets[current], offsets[current + 1]):
+                    neighbor = targets[k]
+                    candidate = current_dist + costs[k]
+                    if candidate < dist.get(neighbor, node_distances[neighbor][column]):
+                        heapq.heappush(heap, (candidate, neighbor))
+            for index, value in dist.items():
+                row = updated.get(index)
+                if row is None:
+                    row = updated[index] = list(node_distances[index])
+                row[column] = value
+        for index, row in updated.items():
+            node_distances[index] = tuple(row)
+        self.version = graph.version
+
+    def heuristic(self, node: int, goal: int) -> float:
+        best = self.graph.distance(node, goal)
+        if self.version != self.graph.version:
+            return best
+        for from_node, from_goal in zip(self.node_distances[node], self.node_distances[goal]):
+            if from_node == float("inf") or from_goal == float("inf"):
+                continue
+            bound = abs(from_goal - from_node)
+            if bound > best:
+                best = bound
+        return best
+
+
+def dijkstra_distances(graph: NavGraph, source: int) -> list[float]:
+    offsets = graph.offsets
+    targets = graph.targets
+    costs = graph.costs
+    dist = [float("inf")] * len(graph)
+    dist[source] = 0.0
+    heap: list[tuple[float, int]] = [(0.0, source)]
+    while heap:
+        current_dist, current = heapq.heappop(heap)
+        if current_dist > dist[current]:
+            continue
+        for k in range(offsets[current], offsets[current + 1]):
+            neighbor = targets[k]
+            candidate = current_dist + costs[k]
+            if candidate < dist[neighbor]:
+                dist[neighbor] = candidate
+                heapq.heappush(heap, (candidate, neighbor))
+    return dist
+
+
+def _finite(value: float) -> float:
+    return value if value != float("inf") else -1.0
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from array import array
+from collections import OrderedDict
+from collections.abc import Callable
+
+from src.nav.graph import NavGraph, NavNode
+
+
+class PathCache:
+    def __init__(self, graph: NavGraph, capacity: int):
+        self.graph = graph
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._version = graph.version
+        self._paths: OrderedDict[tuple[int, int], array] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def clear(self) -> None:
+        self._paths.clear()
+        self._version = self.graph.version
+
+    def get(self, start: NavNode, goal: NavNode) -> list[NavNode] | None:
+        if self._version != self.graph.version:
+            self.clear()
+
+        key = (start.index, goal.index)
+        cached = self._paths.get(key)
+        if cached is None:
+            self.misses += 1
+            return None
+        self._paths.move_to_end(key)
+        self.hits += 1
+        return [self.graph.node(index) for index in cached]
+
+    def put(self, start: NavNode, goal: NavNode, path: list[NavNode]) -> None:
+        if self.capacity <= 0 or not path:
+            return
+        if self._version != self.graph.version:
+            self.clear()
+        self._paths[(start.index, goal.index)] = array("i", (node.index for node in path))
+        if len(self._paths) > self.capacity:
+            self._paths.popitem(last=False)
+            self.evictions += 1
+
+    def get_or_compute(
+        self,
+        start: NavNode,
+        goal: NavNode,
+        solve: Callable[[NavGraph, NavNode, NavNode], list[NavNode]],
+    ) -> list[NavNode]:
+        cached = self.get(start, goal)
+        if cached is not None:
+            return cached
+        path = solve(self.graph, start, goal)
+        self.put(start, goal, path)
+        return path
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from src.core.config import NAV_HPA_CLUSTER_SIZE, NAV_PLANNER
+from src.nav.astar import SearchState, plan_indices
+from src.nav.graph import NavGraph, NavNode
+
+PathCallback = Callable[[list[NavNode]], None]
+
+_worker_graph: NavGraph | None = None
+
+
+@dataclass
+class PathJob:
+    start: NavNode
+    goal: NavNode
+    version: int
+    future: Future | None = None
+    path: list[NavNode] | None = None
+    waiters: list[int] = field(default_factory=list)
+
+
+class PathService:
+    def __init__(self, graph: NavGraph, workers: int = 0, executor: str = "thread", budget: int = 8):
+        self.graph = graph
+        self.budget = budget
+        self.submitted = 0
+        self.deduplicated = 0
+        self.delivered = 0
+        self._jobs: OrderedDict[tuple[int, int], PathJob] = OrderedDict()
+        self._requests: dict[int, tuple[tuple[int, int], PathCallback]] = {}
+        self._local = threading.local()
+        self._executor: Executor | None = None
+        self._worker_version = graph.version
+        if workers > 0 and executor == "process":
+            self._executor = ProcessPoolExecutor(
+                workers,
+                initializer=_init_worker,
+                initargs=(
+                    graph.xs,
+                    graph.ys,
+                    graph.offsets,
+                    graph.targets,
+                    graph.origin,
+                    graph.step,
+                ),
+            )
+        elif workers > 0:
+            self._executor = ThreadPoolExecutor(workers, thread_name_prefix="path")
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def pending(self, bot_id: int) -> bool:
+        return bot_id in self._requests
+
+    def request(self, bot_id: int, start: NavNode, goal: NavNode, finish: PathCallback) -> None:
+        key = (start.index, goal.index)
+        self._requests[bot_id] = (key, finish)
+        job = self._jobs.get(key)
+        if job is not None and job.version == self.graph.version:
+            self.deduplicated += 1
+            if bot_id not in job.waiters:
+                job.waiters.append(bot_id)
+            return
+
+        waiters = [] if job is None else job.waiters
+        if bot_id not in waiters:
+            waiters.append(bot_id)
+        job = PathJob(start, goal, self.graph.version, waiters=waiters)
+        if self.graph.path_cache is not None:
+            job.path = self.graph.path_cache.get(start, goal)
+        if job.path is None:
+            job.future = self._submit(key)
+        self._jobs[key] = job
+        self._jobs.move_to_end(key)
+        self.submitted += 1
+
+    def cancel(self, bot_id: int) -> None:
+        self._requests.pop(bot_id, None)
+
+    def deliver(self) -> int:
+        delivered = 0
+        while self._jobs and delivered < self.budget:
+            key, job = next(iter(self._jobs.items()))
+            if job.future is not None and not job.future.done():
+                break
+            del self._jobs[key]
+            path = self._path(job)
+            for bot_id in job.waiters:
+                request = self._requests.get(bot_id)
+                if request is None or request[0] != key:
+                    continue
+                del self._requests[bot_id]
+                request[1](path)
+            delivered += 1
+        self.delivered += delivered
+        return delivered
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _path(self, job: PathJob) -> list[NavNode]:
+        graph = self.graph
+        cache = graph.path_cache
+        if job.version != graph.version:
+            job.future = None
+        elif job.path is not None:
+            return job.path
+        if job.future is None:
+            indices = plan_indices(graph, job.start.index, job.goal.index, self._state())
+        else:
+            indices = job.future.result()
+        path = [graph.node(index) for index in indices]
+        if cache is not None:
+            cache.put(job.start, job.goal, path)
+        return path
+
+    def _submit(self, key: tuple[int, int]) -> Future | None:
+        if self._executor is None:
+            return None
+        if isinstance(self._executor, ProcessPoolExecutor):
+            if self._worker_version != self.graph.version:
+                return None
+            return self._executor.submit(_solve_in_worker, *key)
+        return self._executor.submit(self._solve, *key)
+
+    def _solve(self, start: int, goal: int) -> list[int]:
+        return plan_indices(self.graph, start, goal, self._state())
+
+    def _state(self) -> SearchState:
+        state = getattr(self._local, "state", None)
+        if state is None or state.size != len(self.graph):
+            state = SearchState(len(self.graph))
+            self._local.state = state
+        return state
+
+
+def _init_worker(xs, ys, offsets, targets, origin, step) -> None:
+    global _worker_graph
+    graph = NavGraph.from_arrays(xs, ys, offsets, targets, origin, step)
+    if NAV_PLANNER == "hpa":
+        from src.nav.hpa import HierarchicalGraph
+
+        graph.hierarchy = HierarchicalGraph(graph, NAV_HPA_CLUSTER_SIZE)
+    elif NAV_PLANNER == "jps":
+        from src.nav.jps import JumpPointSearch
+
+        graph.jump_points = JumpPointSearch(graph)
+    _worker_graph = graph
+
+
+def _solve_in_worker(start: int, goal: int) -> list[int]:
+    return plan_indices(_worker_graph, start, goal)
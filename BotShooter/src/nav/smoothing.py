@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import pygame
+
+from src.core.geometry import ObstacleSet, segment_clear_of_polygon
+
+
+def segment_clear(
+    start: pygame.Vector2,
+    end: pygame.Vector2,
+    obstacles: list[list[pygame.Vector2]],
+    clearance: float,
+) -> bool:
+    if isinstance(obstacles, ObstacleSet):
+        return obstacles.segment_clear(start, end, clearance)
+    for poly in obstacles:
+        if not segment_clear_of_polygon(start, end, poly, clearance):
+            return False
+    return True
+
+
+def smooth_path(
+    points: list[pygame.Vector2],
+    obstacles: list[list[pygame.Vector2]],
+    clearance: float,
+) -> list[pygame.Vector2]:
+    if len(points) <= 2:
+        return list(points)
+
+    smoothed = [points[0]]
+    anchor = points[0]
+    index = 1
+    while index < len(points) - 1:
+        if segment_clear(anchor, points[index + 1], obstacles, clearance):
+            index += 1
+            continue
+        anchor = points[index]
+        smoothed.append(anchor)
+        index += 1
+    smoothed.append(points[-1])
+    return smoothed
+
+
+def smooth_path_ahead(
+    points: list[pygame.Vector2],
+    obstacles: list[list[pygame.Vector2]],
+    clearance: float,
+    lookahead: int,
+) -> list[pygame.Vector2]:
+    if lookahead <= 0 or len(points) <= lookahead + 1:
+        return smooth_path(points, obstacles, clearance)
+    head = smooth_path(points[: lookahead + 1], obstacles, clearance)
+    return head + points[lookahead + 1 :]
@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pygame
+
+from src.core.geometry import has_line_of_sight
+from src.nav.graph import NavGraph
+
+
+class VisibilityTable:
+    def __init__(
+        self,
+        graph: NavGraph,
+        obstacles: list[list[pygame.Vector2]],
+        radius: float,
+        visible_rows: list[bytes],
+        blocked_rows: list[bytes],
+    ):
+        self.graph = graph
+        self.obstacles = obstacles
+        self.radius = radius
+        self.visible_rows = visible_rows
+        self.blocked_rows = blocked_rows
+        self.lookups = 0
+        self.fallbacks = 0
+
+    @classmethod
+    def build(
+        cls,
+        graph: NavGraph,
+        obstacles: list[list[pygame.Vector2]],
+        radius: float,
+        workers: int = 0,
+    ) -> VisibilityTable:
+        count = len(graph)
+        coords = np.empty((count, 2), dtype=np.float32)
+        coords[:, 0] = np.frombuffer(graph.xs, dtype=np.float32)
+        coords[:, 1] = np.frombuffer(graph.ys, dtype=np.float32)
+        edges = _obstacle_edges(obstacles)
+
+        if workers > 1 and count > 1:
+            chunk = max(1, count // (workers * 4))
+            bounds = [(start, min(count, start + chunk)) for start in range(0, count, chunk)]
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                parts = list(
+                    pool.map(
+                        _visibility_rows,
+                        [coords] * len(bounds),
+                        [edges] * len(bounds),
+                        [radius] * len(bounds),
+                        [start for start, _ in bounds],
+                        [stop for _, stop in bounds],
+                    )
+                )
+            visible = np.vstack([part[0] for part in parts])
+            blocked = np.vstack([part[1] for part in parts])
+        else:
+            visible, blocked = _visibility_rows(coords, edges, radius, 0, count)
+
+        visible |= visible.T
+        blocked |= blocked.T
+        return cls(
+            graph,
+            obstacles,
+            radius,
+            [row.tobytes() for row in np.packbits(visible, axis=1)],
+            [row.tobytes() for row in np.packbits(blocked, axis=1)],
+        )
+
+    def invalidate(self, area: pygame.Rect) -> None:
+        graph = self.graph
+        count = len(graph)
+        if count == 0:
+            return
+        region = area.inflate(self.radius * 2 + 2, self.radius * 2 + 2)
+        xs = np.frombuffer(graph.xs, dtype=np.float32)
+        ys = np.frombuffer(graph.ys, dtype=np.float32)
+        x_side = (xs >= region.left).astype(np.int8) + (xs > region.right)
+        y_side = (ys >= region.top).astype(np.int8) + (ys > region.bottom)
+        chunk = max(1, (1 << 22) // count)
+        for x_class in range(3):
+            for y_class in range(3):
+                sources = np.flatnonzero((x_side == x_class) & (y_side == y_class))
+                if not len(sources):
+                    continue
+                if x_class == 1 and y_class == 1:
+                    for source in sources.tolist():
+                        self.visible_rows[source] = bytes(len(self.visible_rows[source]))
+                        self.blocked_rows[source] = bytes(len(self.blocked_rows[source]))
+                    continue
+                overlap = np.ones(count, dtype=bool)
+                if x_class != 1:
+                    overlap &= x_side != x_class
+                if y_class != 1:
+                    overlap &= y_side != y_class
+                columns = np.flatnonzero(overlap)
+                for start in range(0, len(sources), chunk):
+                    rows = sources[start : start + chunk]
+                    hits = _segments_hit_rect(
+                        xs[rows, None], ys[rows, None], xs[None, columns], ys[None, columns], region
+                    )
+                    full = np.zeros((len(rows), count), dtype=bool)
+                    full[:, columns] = hits
+                    keep = ~np.packbits(full, axis=1)
+                    for row, source in enumerate(rows.tolist()):
+                        if not hits[row].any():
+                            continue
+                        mask = keep[row]
+                        self.visible_rows[source] = (
+                            np.frombuffer(self.visible_rows[source], dtype=np.uint8) & mask
+                        ).tobytes()
+                        self.blocked_rows[source] = (
+                            np.frombuffer(self.blocked_rows[source], dtype=np.uint8) & mask
+                        ).tobytes()
+
+    def nodes_visible(self, a: int, b: int) -> bool:
+        return bool(self.visible_rows[a][b >> 3] & (0x80 >> (b & 7)))
+
+    def nodes_blocked(self, a: int, b: int) -> bool:
+        return bool(self.blocked_rows[a][b >> 3] & (0x80 >> (b & 7)))
+
+    def line_of_sight(self, start: pygame.Vector2, end: pygame.Vector2) -> bool:
+        self.lookups += 1
+        graph = self.graph
+        a = graph.nearest_index(start)
+        b = graph.nearest_index(end)
+        limit = self.radius * self.radius
+        if (
+            a >= 0
+            and b >= 0
+            and (graph.xs[a] - start.x) ** 2 + (graph.ys[a] - start.y) ** 2 < limit
+            and (graph.xs[b] - end.x) ** 2 + (graph.ys[b] - end.y) ** 2 < limit
+        ):
+            if self.nodes_visible(a, b):
+                return True
+            if self.nodes_blocked(a, b):
+                return False
+        self.fallbacks += 1
+        return has_line_of_sight(start, end, self.obstacles)
+
+
+def line_of_sight(
+    start: pygame.Vector2,
+    end: pygame.Vector2,
+    obstacles: list[list[pygame.Vector2]],
+    visibility: VisibilityTable | None = None,
+) -> bool:
+    if visibility is None:
+        return has_line_of_sight(start, end, obstacles)
+    return visibility.line_of_sight(start, end)
+
+
+def _obstacle_edges(obstacles: list[list[pygame.Vector2]]) -> np.ndarray:
+    edges = []
+    for poly in obstacles:
+        count = len(poly)
+        for i in range(count):
+            a = poly[i]
+            b = poly[(i + 1) % count]
+            edges.append((a.x, a.y, b.x, b.y))
+    return np.array(edges, dtype=np.float32).reshape(len(edges), 4)
+
+
+def _visibility_rows(
+    coords: np.ndarray, edges: np.ndarray, radius: float, start: int, stop: int
+) -> tuple[np.ndarray, np.ndarray]:
+    count = len(coords)
+    visible = np.zeros((stop - start, count), dtype=bool)
+    blocked = np.zeros((stop - start, count), dtype=bool)
+    if count == 0:
+        return visible, blocked
+    if len(edges) == 0:
+        visible[:, :] = True
+        return visible, blocked
+
+    limit = radius * radius
+    ex0 = edges[:, 0:1]
+    ey0 = edges[:, 1:2]
+    ex1 = edges[:, 2:3]
+    ey1 = edges[:, 3:4]
+    elen = np.sqrt((ex1 - ex0) ** 2 + (ey1 - ey0) ** 2)
+    elen = np.where(elen > 0.0, elen, 1.0)
+    ax = coords[:, 0][None, :]
+    ay = coords[:, 1][None, :]
+    node_to_edge = _point_segment_distance_sq(ax, ay, ex0, ey0, ex1, ey1)
+    node_side = _cross(ex0, ey0, ex1, ey1, ax, ay) / elen
+
+    for row, source in enumerate(range(start, stop)):
+        sx, sy = coords[source]
+        targets = slice(source + 1, count)
+        tx = ax[:, targets]
+        ty = ay[:, targets]
+
+        clearance = np.minimum(
+            _point_segment_distance_sq(sx, sy, ex0, ey0, ex1, ey1),
+            node_to_edge[:, targets],
+        )
+        clearance = np.minimum(clearance, _point_segment_distance_sq(ex0, ey0, sx, sy, tx, ty))
+        clearance = np.minimum(clearance, _point_segment_distance_sq(ex1, ey1, sx, sy, tx, ty))
+
+        d1 = node_side[:, source : source + 1]
+        d2 = node_side[:, targets]
+        d3 = _cross(sx, sy, tx, ty, ex0, ey0)
+        d4 = _cross(sx, sy, tx, ty, ex1, ey1)
+        crossing = ((d1 > 0) != (d2 > 0)) & ((d3 > 0) != (d4 > 0))
+        visible[row, targets] = ((clearance > limit) & ~crossing).all(axis=0)
+        visible[row, source] = True
+
+        dx = tx - sx
+        dy = ty - sy
+        length = np.sqrt(dx * dx + dy * dy)
+        safe = np.where(length > 0.0, length, 1.0)
+        t0 = ((ex0 - sx) * dx + (ey0 - sy) * dy) / safe
+        t1 = ((ex1 - sx) * dx + (ey1 - sy) * dy) / safe
+        low = radius
+        high = length - radius
+        straddles_edge = (
+            (np.abs(d1) > radius) & (np.abs(d2) > radius) & ((d1 > 0) != (d2 > 0))
+        )
+        straddles_path = (
+            (np.abs(d3) > radius * safe)
+            & (np.abs(d4) > radius * safe)
+            & ((d3 > 0) != (d4 > 0))
+            & (t0 >= low)
+            & (t0 <= high)
+            & (t1 >= low)
+            & (t1 <= high)
+        )
+        blocked[row, targets] = (straddles_edge & straddles_path).any(axis=0)
+    return visible, blocked
+
+
+def _segments_hit_rect(sx, sy, tx, ty, rect: pygame.Rect) -> np.ndarray:
+    low = np.float32(0.0)
+    high = np.float32(1.0)
+    for start, end, lo, hi in ((sx, tx, rect.left, rect.right), (sy, ty, rect.top, rect.bottom)):
+        delta = end - start
+        flat = delta == 0.0
+        delta[flat] = 1.0
+        t0 = (np.float32(lo) - start) / delta
+        t1 = (np.float32(hi) - start) / delta
+        near = np.minimum(t0, t1)
+        far = np.maximum(t0, t1)
+        if flat.any():
+            inside = (start >= lo) & (start <= hi)
+            near[flat] = np.broadcast_to(np.where(inside, 0.0, 2.0), flat.shape)[flat]
+            far[flat] = 1.0
+        low = np.maximum(low, near)
+        high = np.minimum(high, far)
+    return low <= high
+
+
+def _cross(ax, ay, bx, by, px, py):
+    return (bx - ax) * (py - ay) - (by - ay) * (px - ax)
+
+
+def _point_segment_distance_sq(px, py, ax, ay, bx, by):
+    abx = bx - ax
+    aby = by - ay
+    denom = abx * abx + aby * aby
+    t = ((px - ax) * abx + (py - ay) * aby) / np.where(denom > 0.0, denom, 1.0)
+    t = np.clip(t, 0.0, 1.0)
+    dx = ax + abx * t - px
+    dy = ay + aby * t - py
+    return dx * dx + dy * dy